@@ -0,0 +1,182 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from market_time import (
+    SESSION_MINUTES,
+    TIME_CODE_COLUMNS,
+    session_minute,
+    with_time_codes,
+)
+from option_chain_dataset import OPTIONS_DATASET, open_chain_dataset
+
+
+AVAILABILITY_INDEX = "database/options_availability.parquet"
+AVAILABILITY_KEYS = ["expiry", "trade_date", "strike", "option_type"]
+PARTITION_KEYS = ["expiry", "trade_date"]
+
+
+# === BUILD BITMAPS === #
+# One row per (expiry, trade_date, strike, option_type) with the session
+# minutes that have a bar packed into a SESSION_MINUTES-bit bitmap.
+def availability_frame(chain):
+    minutes = with_time_codes(chain)["minute_of_session"].to_numpy().astype(np.int64)
+    in_session = minutes < SESSION_MINUTES
+
+    keys = chain.loc[in_session, AVAILABILITY_KEYS].astype(
+        {"expiry": str, "trade_date": str, "option_type": str}
+    )
+    codes, contracts = pd.MultiIndex.from_frame(keys).factorize()
+
+    bits = np.zeros((len(contracts), SESSION_MINUTES), dtype=bool)
+    bits[codes, minutes[in_session]] = True
+
+    df = pd.DataFrame(list(contracts), columns=AVAILABILITY_KEYS)
+    df["strike"] = df["strike"].astype("int32")
+    df["bitmap"] = [row.tobytes() for row in np.packbits(bits, axis=1)]
+
+    return df
+
+
+def build_availability(dataset_root=OPTIONS_DATASET):
+    dataset = open_chain_dataset(dataset_root)
+    columns = AVAILABILITY_KEYS + ["timestamp"]
+    columns += [
+        column for column in TIME_CODE_COLUMNS if column in dataset.schema.names
+    ]
+
+    chain = dataset.to_table(columns=columns).to_pandas()
+
+    return availability_frame(chain)
+
+
+def update_availability_index(frames, path=AVAILABILITY_INDEX):
+    frames = [frame for frame in frames if frame is not None and not frame.empty]
+
+    if not frames:
+        return
+
+    df = pd.concat(frames, ignore_index=True)
+
+    # Rows of the (expiry, trade_date) partitions in `frames` are replaced.
+    if os.path.exists(path):
+        existing = pd.read_parquet(path)
+        partitions = pd.MultiIndex.from_frame(existing[PARTITION_KEYS])
+        existing = existing[
+            ~partitions.isin(pd.MultiIndex.from_frame(df[PARTITION_KEYS]))
+        ]
+        df = pd.concat([existing, df], ignore_index=True)
+
+    df = df.sort_values(AVAILABILITY_KEYS).reset_index(drop=True)
+
+    # Written aside and renamed, so a failed write keeps the previous index.
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    df.to_parquet(temp_path, index=False)
+    os.replace(temp_path, path)
+
+
+def indexed_partitions(path=AVAILABILITY_INDEX):
+    if not os.path.exists(path):
+        return set()
+
+    df = pd.read_parquet(path, columns=PARTITION_KEYS)
+
+    return set(zip(df["expiry"], df["trade_date"]))
+
+
+# === LOOKUPS === #
+class AvailabilityIndex:
+    def __init__(self, df):
+        self.bits = np.frombuffer(b"".join(df["bitmap"]), dtype=np.uint8).reshape(
+            len(df), -1
+        )
+        self.rows = {
+            key: row
+            for row, key in enumerate(
+                zip(
+                    df["expiry"],
+                    df["strike"].astype(int),
+                    df["option_type"],
+                    df["trade_date"],
+                )
+            )
+        }
+        self.partitions = set(zip(df["expiry"], df["trade_date"]))
+        self.checked = 0
+        self.unknown = 0
+        self.missing_contracts = 0
+        self.missing_bars = 0
+
+    @classmethod
+    def load(cls, path=AVAILABILITY_INDEX):
+        if not os.path.exists(path):
+            return None
+
+        return cls(pd.read_parquet(path))
+
+    def has_contract(self, expiry, strike, option_type, trading_day):
+        return (expiry, int(strike), option_type, str(trading_day)) in self.rows
+
+    # An (expiry, trading day) the index has no rows for (not ingested yet, or
+    # its index update was lost) is unknown rather than empty: every minute
+    # passes and the bars themselves decide. So are minutes outside the session
+    # (a 15:30 print), which the bitmaps do not cover.
+    def known(self, expiry, trading_day):
+        return (expiry, str(trading_day)) in self.partitions
+
+    def has_bar(self, expiry, strike, option_type, timestamp):
+        self.checked += 1
+
+        trading_day = str(timestamp.date())
+        row = self.rows.get((expiry, int(strike), option_type, trading_day))
+        minute = session_minute(timestamp)
+
+        if not 0 <= minute < SESSION_MINUTES or (
+            row is None and not self.known(expiry, trading_day)
+        ):
+            self.unknown += 1
+            return True
+
+        if row is None:
+            self.missing_contracts += 1
+            return False
+
+        if not (self.bits[row, minute >> 3] >> (7 - (minute & 7))) & 1:
+            self.missing_bars += 1
+            return False
+
+        return True
+
+    def has_bars(self, expiry, legs, timestamp):
+        available = [
+            self.has_bar(expiry, strike, option_type, timestamp)
+            for strike, option_type in legs
+        ]
+
+        return all(available)
+
+    def minutes(self, expiry, strike, option_type, trading_day):
+        row = self.rows.get((expiry, int(strike), option_type, str(trading_day)))
+
+        if row is None and not self.known(expiry, trading_day):
+            return np.ones(SESSION_MINUTES, dtype=bool)
+
+        if row is None:
+            return np.zeros(SESSION_MINUTES, dtype=bool)
+
+        return np.unpackbits(self.bits[row])[:SESSION_MINUTES].astype(bool)
+
+    def coverage(self):
+        missing = self.missing_contracts + self.missing_bars
+
+        return {
+            "checked": self.checked,
+            "unknown": self.unknown,
+            "missing_contracts": self.missing_contracts,
+            "missing_bars": self.missing_bars,
+            "coverage": (
+                (self.checked - missing) / self.checked if self.checked else 1.0
+            ),
+        }
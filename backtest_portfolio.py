@@ -0,0 +1,113 @@
+import argparse
+import logging
+import os
+
+import pandas as pd
+
+import backtest_directional
+import backtest_mean_reversion
+import backtest_semi_directional
+from engine.event_log import event_logging
+from engine.market_data import MarketData
+from engine.portfolio import run_portfolio
+from engine.runner import positions_frame
+from engine.sweep import trade_log
+from expiry_calendar import ExpiryCalendar
+from summary import calculate_stats_from_trades, combine_leg_positions
+
+
+# === CONFIG === #
+# The strategy scripts configure logging on import; this run logs to its own file.
+if not os.path.exists("logs"):
+    os.makedirs("logs")
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    handlers=[
+        logging.FileHandler("logs/backtest_portfolio.log"),
+        logging.StreamHandler(),
+    ],
+    force=True,
+)
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Each strategy uses its own script's constants and results folder; listed in
+# the order summary_file_creator.ipynb combines them.
+STRATEGY_SCRIPTS = [
+    backtest_directional,
+    backtest_semi_directional,
+    backtest_mean_reversion,
+]
+PORTFOLIO_POSITIONS_FILE = "portfolio_combined_positions.csv"
+LOG_MODE = "full"  # "full" or "events" (see engine/event_log.py)
+EVENT_LOG = "logs/backtest_portfolio_events.arrow"
+BAR_LOG_SAMPLE = 60
+
+
+# === BACKTESTING FUNCTION === #
+# Every strategy over one pass of the market data (see engine.portfolio).
+def backtest(start_date, end_date, workers=1, resume=False):
+    strategies = [
+        (script.strategy(), script.backtest_config()) for script in STRATEGY_SCRIPTS
+    ]
+
+    with event_logging(LOG_MODE, EVENT_LOG, BAR_LOG_SAMPLE):
+        results = run_portfolio(
+            strategies, start_date, end_date, workers=workers, resume=resume
+        )
+
+    # === PORTFOLIO POSITIONS === #
+    # Combined trades of every strategy, as summary_file_creator.ipynb writes
+    # them: each strategy's trades get its calculate_stats_from_trades() columns
+    # (Cumulative Capital, Month) before they are merged. A resumed run only has
+    # the days it ran itself, so it leaves the file as it is.
+    if resume:
+        logger.info(f"Resumed run: {PORTFOLIO_POSITIONS_FILE} not updated")
+        return results
+
+    expiry_calendar = ExpiryCalendar(MarketData(strategies[0][1]).expiry_folders())
+    strategy_positions = []
+
+    for (strategy, config), strategy_results in zip(strategies, results):
+        positions = trade_log(
+            [
+                combine_leg_positions(positions_frame(strategy, config, ledger))
+                for _, ledger, _ in strategy_results
+                if ledger
+            ],
+            expiry_calendar,
+        )
+
+        if positions is not None:
+            calculate_stats_from_trades(trades=positions)
+            strategy_positions.append(positions)
+
+    if strategy_positions:
+        all_positions = pd.concat(strategy_positions).sort_values(by="Entry Timestamp")
+        all_positions.to_csv(PORTFOLIO_POSITIONS_FILE, index=False)
+        logger.info(f"Saved {PORTFOLIO_POSITIONS_FILE}: {len(all_positions)} trades")
+
+    return results
+
+
+# === RUN BACKTEST === #
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Portfolio options backtest")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="worker processes running trading days in parallel (0: one per CPU)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="skip the days a previous run with the same settings finished",
+    )
+    args = parser.parse_args()
+
+    backtest(
+        "2024-01-01", "2024-12-31", workers=args.workers or None, resume=args.resume
+    )
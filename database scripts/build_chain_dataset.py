@@ -0,0 +1,7 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from option_chain_dataset import convert_options_folder
+
+convert_options_folder("../database/options/", "../database/options_chain/")
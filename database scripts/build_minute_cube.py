@@ -0,0 +1,12 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from minute_cube import build_cube
+
+
+outside_bars = build_cube("../database/options_chain/", "../database/options_cube/")
+
+# Those days are read from the dataset by backtests with OPTIONS_STORAGE = "cube".
+for expiry, bars in outside_bars.items():
+    print(f"{expiry}: {bars} bars outside the session, not in the cube")
@@ -0,0 +1,289 @@
+import argparse
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from availability import (
+    availability_frame,
+    build_availability,
+    indexed_partitions,
+    update_availability_index,
+)
+from market_time import add_time_codes
+from option_chain_dataset import write_chain
+
+
+OPTION_SYMBOL_PATTERN = (
+    r"^NIFTY(?P<expiry>\d{2}[A-Z]{3}\d{2})(?P<strike>\d+)(?P<option_type>CE|PE)$"
+)
+
+CSV_COLUMN_TYPES = {
+    "symbol": pa.dictionary(pa.int32(), pa.string()),
+    "time": pa.string(),
+    "open": pa.float64(),
+    "high": pa.float64(),
+    "low": pa.float64(),
+    "close": pa.float64(),
+    "volume": pa.int64(),
+    "oi": pa.int64(),
+}
+
+
+# === READ ONE DAY CSV === #
+def file_trading_day(file):
+    return os.path.basename(file).split("_")[1].split(".")[0]
+
+
+def read_day_table(file):
+    return pv.read_csv(
+        file,
+        convert_options=pv.ConvertOptions(
+            column_types=CSV_COLUMN_TYPES,
+            include_columns=list(CSV_COLUMN_TYPES),
+        ),
+    )
+
+
+def read_day_csv(file):
+    df = read_day_table(file).to_pandas()
+    df["timestamp"] = pd.to_datetime(
+        file_trading_day(file) + df["time"], format="%Y%m%d%H:%M:%S"
+    )
+
+    return df.drop(columns=["time"])
+
+
+# === SPLIT OPTION SYMBOLS === #
+# Symbols are parsed once per distinct symbol and broadcast back through the
+# categorical codes; spot/futures rows ("NIFTY", "NIFTY-I") do not match.
+def split_option_symbols(df):
+    symbols = df["symbol"].astype("category")
+    parts = symbols.cat.categories.to_series().str.extract(OPTION_SYMBOL_PATTERN)
+
+    codes = symbols.cat.codes.to_numpy()
+    is_option = parts["expiry"].notna().to_numpy()[codes] & (codes >= 0)
+
+    df = df.loc[is_option].drop(columns=["symbol"])
+    codes = codes[is_option]
+
+    df["expiry"] = parts["expiry"].to_numpy()[codes]
+    df["strike"] = parts["strike"].to_numpy()[codes].astype("int32")
+    df["option_type"] = parts["option_type"].to_numpy()[codes]
+
+    return df
+
+
+# === INGEST OPTIONS === #
+def ingested_partitions(dataset_root):
+    return {
+        (
+            os.path.basename(os.path.dirname(path)).split("=", 1)[1],
+            os.path.basename(path).split("=", 1)[1],
+        )
+        for path in glob.glob(os.path.join(dataset_root, "expiry=*", "trade_date=*"))
+    }
+
+
+# Partitions in `skip` are left as they are; a day file spans several expiries,
+# so a day stopped partway only writes the partitions it is missing.
+def ingest_options_file(file, dataset_root, skip=()):
+    df = split_option_symbols(read_day_csv(file))
+
+    df["trade_date"] = df["timestamp"].dt.date.astype(str)
+
+    if skip:
+        partitions = pd.MultiIndex.from_arrays([df["expiry"], df["trade_date"]])
+        df = df.loc[~partitions.isin(list(skip))]
+
+    df = df.drop_duplicates(
+        ["expiry", "strike", "option_type", "timestamp"], keep="last"
+    )
+    df = add_time_codes(df)
+
+    write_chain(df, dataset_root)
+
+    return len(df), availability_frame(df)
+
+
+def ingest_options_files(
+    files, dataset_root, availability_path, overwrite=False, workers=None
+):
+    # A partition counts as ingested once the availability index has its rows;
+    # written partitions without them (an index update that failed) are
+    # written again.
+    skip = set()
+    if not overwrite:
+        skip = ingested_partitions(dataset_root) & indexed_partitions(availability_path)
+
+    # Each day file only touches its own trade_date= partitions, so workers
+    # write their partitions directly and return their availability rows,
+    # which go into the index as each file finishes.
+    failed = []
+
+    for file, result, error in map_files(
+        ingest_options_file, files, (dataset_root, skip), workers
+    ):
+        if error is not None:
+            failed.append(file)
+        else:
+            rows, availability = result
+            update_availability_index([availability], availability_path)
+
+            if rows:
+                print(f"Ingested {file}: {rows} bars")
+            else:
+                print(f"Skipping {file}: already ingested")
+
+    return failed
+
+
+# === INGEST SPOT INDEX === #
+def read_spot_file(file):
+    table = read_day_table(file)
+    table = table.filter(pc.equal(table["symbol"].cast(pa.string()), "NIFTY"))
+
+    df = table.select(["time", "close"]).to_pandas()
+    df["timestamp"] = pd.to_datetime(
+        file_trading_day(file) + df["time"], format="%Y%m%d%H:%M:%S"
+    )
+
+    df = add_time_codes(df.drop(columns=["time"]))
+
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+# The index is only written when every file was read, so a failed day is
+# never silently missing from it.
+def ingest_spot_files(files, output_file, workers=None):
+    results = list(map_files(read_spot_file, files, (), workers))
+    failed = [file for file, _, error in results if error is not None]
+
+    if failed:
+        print(f"Not saving {output_file}: {len(failed)} files failed")
+        return failed
+
+    tables = [table for _, table, _ in results]
+
+    if not tables:
+        return failed
+
+    table = pa.concat_tables(tables)
+    table = table.take(pc.sort_indices(table, [("timestamp", "ascending")]))
+
+    pq.write_table(table, output_file)
+    print(f"Saved {output_file}: {table.num_rows} bars")
+
+    return failed
+
+
+# === PROCESS POOL === #
+# Files are processed in sorted order and results are yielded in that order as
+# they finish.
+# A failing file is reported and skipped without affecting the others; the
+# ingest functions return the failed files. workers=0 or None: one per CPU.
+def run_isolated(task):
+    func, file, args = task
+
+    try:
+        return file, func(file, *args), None
+    except Exception as e:
+        return file, None, f"{type(e).__name__}: {e}"
+
+
+def map_files(func, files, args=(), workers=None):
+    tasks = [(func, file, args) for file in sorted(files)]
+
+    if workers == 1:
+        results = map(run_isolated, tasks)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers or None)
+        results = executor.map(run_isolated, tasks)
+
+    try:
+        for file, result, error in results:
+            if error is not None:
+                print(f"Failed {file}: {error}")
+
+            yield file, result, error
+    finally:
+        if workers != 1:
+            executor.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest maticalgos day CSVs")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="worker processes (default or 0: one per CPU, 1 runs in-process)",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    options_parser = subparsers.add_parser("options", help="option chain dataset")
+    options_parser.add_argument("data_folder", nargs="?", default="../data/")
+    options_parser.add_argument(
+        "dataset_root", nargs="?", default="../database/options_chain/"
+    )
+    options_parser.add_argument(
+        "--availability",
+        default="../database/options_availability.parquet",
+        help="availability index updated with the ingested days",
+    )
+    options_parser.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="re-ingest trading days that already have partitions",
+    )
+
+    spot_parser = subparsers.add_parser("spot", help="NIFTY spot index parquet")
+    spot_parser.add_argument("data_folder", nargs="?", default="../data/")
+    spot_parser.add_argument(
+        "output_file", nargs="?", default="../database/index/nifty_2024.parquet"
+    )
+
+    availability_parser = subparsers.add_parser(
+        "availability", help="rebuild the availability index from the dataset"
+    )
+    availability_parser.add_argument(
+        "dataset_root", nargs="?", default="../database/options_chain/"
+    )
+    availability_parser.add_argument(
+        "output_file", nargs="?", default="../database/options_availability.parquet"
+    )
+
+    args = parser.parse_args()
+    failed = []
+
+    if args.command == "options":
+        failed = ingest_options_files(
+            glob.glob(os.path.join(args.data_folder, "nifty_*.csv")),
+            args.dataset_root,
+            args.availability,
+            overwrite=args.overwrite,
+            workers=args.workers,
+        )
+    elif args.command == "spot":
+        failed = ingest_spot_files(
+            glob.glob(os.path.join(args.data_folder, "nifty_*.csv")),
+            args.output_file,
+            workers=args.workers,
+        )
+    else:
+        if os.path.exists(args.output_file):
+            os.remove(args.output_file)
+
+        update_availability_index(
+            [build_availability(args.dataset_root)], args.output_file
+        )
+
+    if failed:
+        sys.exit(f"Failed to ingest {len(failed)} files: {', '.join(failed)}")
@@ -0,0 +1,14 @@
+from engine.config import BacktestConfig
+from engine.event_log import event_logging
+from engine.market_data import MarketData, OptionData
+from engine.orders import Ledger
+from engine.portfolio import run_portfolio
+from engine.run_cache import RunCache, cached_backtest
+from engine.runner import run_backtest
+from engine.strategies import (
+    DirectionalStrategy,
+    MeanReversionStrategy,
+    SemiDirectionalStrategy,
+)
+from engine.strategy import Strategy
+
@@ -0,0 +1,80 @@
+import hashlib
+import json
+import os
+
+
+CHECKPOINTS_FOLDER = "checkpoints"
+
+
+# Everything that changes a day's trades besides the market data: strategy,
+# parameters and config (the run id only names the output).
+def run_hash(strategy, config):
+    settings = {
+        "strategy": type(strategy).__name__,
+        "parameters": vars(strategy),
+        "config": {
+            name: value for name, value in vars(config).items() if name != "run_id"
+        },
+    }
+
+    return hashlib.sha1(
+        json.dumps(settings, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def day_key(run_hash, data_version):
+    return hashlib.sha1(f"{run_hash}:{data_version}".encode()).hexdigest()
+
+
+# Writes through a hidden temp file renamed into place, so a crash never leaves
+# a partial file under the final name (and dataset readers skip the temp).
+def write_atomic(path, write):
+    folder, name = os.path.split(path)
+    temp_path = os.path.join(folder, f".{name}.{os.getpid()}.tmp")
+
+    write(temp_path)
+    os.replace(temp_path, path)
+
+
+# === CHECKPOINTS === #
+# One small file per finished trading day holding its key (see day_key()) and,
+# for parquet runs, the part files its rows were flushed to. It is written only
+# after the day's results are in place, so a day without a matching checkpoint
+# is rerun by a resumed backtest.
+class Checkpoints:
+    def __init__(self, folder):
+        self.folder = folder
+
+    def path(self, trading_day):
+        return os.path.join(self.folder, f"{trading_day}.json")
+
+    def record(self, trading_day):
+        try:
+            with open(self.path(trading_day)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def mark(self, trading_day, key, parts=()):
+        os.makedirs(self.folder, exist_ok=True)
+
+        def write(path):
+            with open(path, "w") as f:
+                json.dump({"key": key, "parts": list(parts)}, f)
+
+        write_atomic(self.path(trading_day), write)
+
+    def clear(self, trading_day):
+        if os.path.exists(self.path(trading_day)):
+            os.remove(self.path(trading_day))
+
+    # Checkpointed days as "YYYY-MM-DD".
+    def days(self):
+        if not os.path.isdir(self.folder):
+            return []
+
+        return sorted(
+            name[: -len(".json")]
+            for name in os.listdir(self.folder)
+            if name.endswith(".json")
+        )
@@ -0,0 +1,42 @@
+# === BACKTEST CONFIG === #
+# Everything a run needs besides the strategy: data locations, storage layout,
+# session times and costs. The scripts build it from their module constants.
+class BacktestConfig:
+    def __init__(
+        self,
+        results_folder,
+        nifty_index_file="database/index/nifty_2024.parquet",
+        options_folder="database/options/",
+        options_dataset="database/options_chain/",
+        options_cube="database/options_cube/",
+        availability_index="database/options_availability.parquet",
+        feature_store="database/features/",
+        options_storage="files",
+        mode="loop",
+        results_format="csv",
+        lot_size=75,
+        slippage_percent=0.01,
+        start_time="09:20:00",
+        end_time="15:20:00",
+        entry_cutoff="15:20:00",
+        event_days_trades=False,
+        event_days_list=(),
+    ):
+        self.results_folder = results_folder
+        self.nifty_index_file = nifty_index_file
+        self.options_folder = options_folder
+        self.options_dataset = options_dataset
+        self.options_cube = options_cube
+        self.availability_index = availability_index
+        self.feature_store = feature_store
+        self.options_storage = options_storage
+        self.mode = mode  # "loop" or "vectorized"
+        self.results_format = results_format  # "csv" or "parquet" (engine.results)
+        self.lot_size = lot_size
+        self.slippage_percent = slippage_percent
+        self.start_time = start_time
+        self.end_time = end_time
+        self.entry_cutoff = entry_cutoff
+        self.event_days_trades = event_days_trades
+        self.event_days_list = list(event_days_list)
+        self.run_id = None  # set by engine.results.start_run
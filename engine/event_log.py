@@ -0,0 +1,144 @@
+import logging
+import multiprocessing
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+
+import pandas as pd
+import pyarrow as pa
+
+
+logger = logging.getLogger()
+
+# Bar-level diagnostics (minute, strikes, indicator values) are logged here,
+# trades and day-level progress on the root logger.
+bar_logger = logging.getLogger("bars")
+
+EVENT_SCHEMA = pa.schema(
+    [
+        ("market_time", pa.timestamp("ns")),
+        ("created", pa.timestamp("us")),
+        ("process", pa.int32()),
+        ("logger", pa.string()),
+        ("level", pa.string()),
+        ("message", pa.string()),
+    ]
+)
+EVENT_BATCH_SIZE = 4096
+
+
+# === BAR SAMPLING === #
+# The bar loop calls start_day() / next_bar(); bar diagnostics pass for one bar
+# in `every`. The current market time is stamped on the event log records.
+class BarSampler(logging.Filter):
+    def __init__(self):
+        super().__init__()
+        self.every = 1
+        self.count = 0
+        self.sampled = True
+        self.market_time = None
+
+    def start_day(self, trading_day):
+        self.count = 0
+        self.market_time = pd.Timestamp(trading_day)
+
+    def next_bar(self, timestamp):
+        self.sampled = self.count % self.every == 0
+        self.count += 1
+        self.market_time = timestamp
+
+    def filter(self, record):
+        return self.sampled
+
+
+bar_sampler = BarSampler()
+bar_logger.addFilter(bar_sampler)
+
+
+# === EVENT LOG === #
+# Records are formatted by the QueueHandler in the logging process and written
+# by a QueueListener thread as Arrow IPC record batches. The queue is a
+# multiprocessing one, so day-parallel workers log into the same file.
+class EventQueueHandler(QueueHandler):
+    def prepare(self, record):
+        record = super().prepare(record)
+
+        if getattr(record, "market_time", None) is None:
+            record.market_time = bar_sampler.market_time
+
+        return record
+
+
+class ArrowEventHandler(logging.Handler):
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self.writer = pa.ipc.new_file(path, EVENT_SCHEMA)
+        self.rows = []
+
+    def emit(self, record):
+        self.rows.append(
+            (
+                record.market_time,
+                pd.Timestamp(record.created, unit="s"),
+                record.process,
+                record.name,
+                record.levelname,
+                record.getMessage(),
+            )
+        )
+
+        if len(self.rows) >= EVENT_BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+
+        columns = list(zip(*self.rows))
+        self.writer.write_batch(
+            pa.record_batch(
+                [
+                    pa.array(column, type=field.type)
+                    for column, field in zip(columns, EVENT_SCHEMA)
+                ],
+                schema=EVENT_SCHEMA,
+            )
+        )
+        self.rows = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+        super().close()
+
+
+# "full" logs every bar to the scripts' handlers as before. "events" keeps
+# trades and day-level progress in the text logs, samples one bar in
+# `sample_every` and writes everything to the Arrow event log at `path` (see
+# render_events.py).
+@contextmanager
+def event_logging(mode="full", path=None, sample_every=60):
+    if mode == "full":
+        yield
+        return
+
+    queue = multiprocessing.Queue(-1)
+    queue_handler = EventQueueHandler(queue)
+    event_handler = ArrowEventHandler(path)
+    listener = QueueListener(queue, event_handler)
+
+    bar_sampler.every = sample_every
+    bar_logger.propagate = False
+    bar_logger.addHandler(queue_handler)
+    logger.addHandler(queue_handler)
+    listener.start()
+
+    try:
+        yield
+    finally:
+        logger.removeHandler(queue_handler)
+        bar_logger.removeHandler(queue_handler)
+        bar_logger.propagate = True
+        bar_sampler.every = 1
+        listener.stop()
+        event_handler.close()
@@ -0,0 +1,314 @@
+import glob
+import logging
+import os
+from collections import OrderedDict
+
+import pandas as pd
+
+from availability import AvailabilityIndex
+from feature_store import FeatureStore, data_version, feature_set_name
+from indicators import BatchIndicators
+from market_time import (
+    MINUTES_PER_DAY,
+    TIME_CODE_COLUMNS,
+    epoch_day,
+    epoch_minute,
+    read_bars,
+    with_time_codes,
+)
+from minute_cube import MinuteCube
+from option_cache import OptionDayCache
+from option_chain_dataset import ChainDayReader, list_expiries, partition_path
+from spot_index import SpotIndex
+
+
+logger = logging.getLogger()
+
+# Indicator sets kept by MarketData.options(); a sweep chunk uses one (see
+# engine.sweep.sweep_chunks), so older sets only hold memory.
+OPTION_SETS_SIZE = 2
+
+
+# === MARKET DATA === #
+# One data path for every strategy: spot index, expiries, availability and
+# option bars with indicators, for the storage layout in the config. Raw chain
+# readers are shared; indicator batches and the per-day bar cache are kept per
+# indicator set, so strategies (or parameter sets) never see each other's
+# columns. Only the OPTION_SETS_SIZE most recently used sets are kept; runners
+# keep their own reference to theirs.
+class MarketData:
+    def __init__(self, config):
+        self.config = config
+        self.chain_reader = ChainDayReader(config.options_dataset)
+        self.minute_cube = MinuteCube(config.options_cube)
+        self.option_sets = OrderedDict()
+        self.raw_columns = []
+        self.raw_key = None
+        self.raw_frames = {}
+        self.spot_index = None
+        self.availability = None
+        self.availability_loaded = False
+
+    # The spot index and availability are read once and shared by every run
+    # on this MarketData (sweeps run thousands of strategies on one).
+    def load_spot_index(self):
+        if self.spot_index is None:
+            self.spot_index = SpotIndex.load(self.config.nifty_index_file)
+
+        return self.spot_index
+
+    def load_availability(self):
+        if not self.availability_loaded:
+            self.availability = AvailabilityIndex.load(self.config.availability_index)
+            self.availability_loaded = True
+
+        return self.availability
+
+    def expiry_folders(self):
+        if self.config.options_storage == "dataset":
+            return list_expiries(self.config.options_dataset)
+
+        if self.config.options_storage == "cube":
+            return self.minute_cube.expiries()
+
+        return os.listdir(self.config.options_folder)
+
+    def option_file_path(self, expiry_folder, strike, option_type):
+        return f"{self.config.options_folder}/{expiry_folder}/{strike}/NIFTY{expiry_folder}{strike}{option_type}.parquet"
+
+    # Files an indicator batch is computed from, for the feature store's data version.
+    def source_paths(self, *key):
+        if self.config.options_storage == "dataset":
+            expiry_folder, trading_day = key
+            return glob.glob(
+                os.path.join(
+                    partition_path(
+                        self.config.options_dataset, expiry_folder, trading_day
+                    ),
+                    "*",
+                )
+            )
+
+        if self.config.options_storage == "cube":
+            return [
+                os.path.join(self.config.options_cube, f"{key[0]}.npy"),
+                os.path.join(self.config.options_cube, "index.json"),
+            ]
+
+        return glob.glob(
+            os.path.join(self.config.options_folder, key[0], "*", "*.parquet")
+        )
+
+    def index_paths(self):
+        return [
+            path
+            for path in [self.config.nifty_index_file, self.config.availability_index]
+            if os.path.exists(path)
+        ]
+
+    # Every input file of a run: spot index, availability index and the option
+    # bars of the storage layout.
+    def data_paths(self):
+        paths = self.index_paths()
+
+        if self.config.options_storage == "dataset":
+            pattern = os.path.join(self.config.options_dataset, "**", "*.parquet")
+        elif self.config.options_storage == "cube":
+            pattern = os.path.join(self.config.options_cube, "*")
+        else:
+            pattern = os.path.join(self.config.options_folder, "*", "*", "*.parquet")
+
+        return paths + glob.glob(pattern, recursive=True)
+
+    def data_version(self):
+        return data_version(self.data_paths())
+
+    # The input files of one trading day: spot index, availability index and
+    # the option batch the day's bars come from.
+    def day_paths(self, expiry_folder, trading_day):
+        key = (expiry_folder,)
+
+        if self.config.options_storage == "dataset":
+            key = (expiry_folder, str(trading_day))
+
+        return self.index_paths() + self.source_paths(*key)
+
+    def day_version(self, expiry_folder, trading_day):
+        return data_version(self.day_paths(expiry_folder, trading_day))
+
+    # Raw bars of the last chain day / expiry read, with the columns of every
+    # strategy on this MarketData, so strategies run side by side (see
+    # engine.portfolio) read each batch once and take their own columns.
+    def shared_frames(self, key, load, columns):
+        key = (*key, *self.raw_columns)
+
+        if key != self.raw_key:
+            self.raw_frames = load(self.raw_columns)
+            self.raw_key = key
+
+        if columns == self.raw_columns:
+            return self.raw_frames
+
+        extra = [column for column in self.raw_columns if column not in columns]
+
+        return {
+            member: df.drop(columns=extra, errors="ignore")
+            for member, df in self.raw_frames.items()
+        }
+
+    def load_chain_day(self, expiry_folder, trading_day, columns):
+        return self.shared_frames(
+            ("chain", expiry_folder, str(trading_day)),
+            lambda raw_columns: self.read_chain_day(
+                expiry_folder, trading_day, raw_columns
+            ),
+            columns,
+        )
+
+    def load_expiry_days(self, expiry_folder, columns):
+        return self.shared_frames(
+            ("expiry", expiry_folder),
+            lambda raw_columns: self.read_expiry_days(expiry_folder, raw_columns),
+            columns,
+        )
+
+    def read_chain_day(self, expiry_folder, trading_day, columns):
+        if self.config.options_storage == "cube" and self.minute_cube.covers(
+            expiry_folder, trading_day
+        ):
+            chain = self.minute_cube.chain_day(expiry_folder, trading_day)
+        else:
+            if self.config.options_storage == "cube":
+                logger.info(
+                    "Bars outside the session: %s %s read from the dataset",
+                    expiry_folder,
+                    trading_day,
+                )
+
+            chain = self.chain_reader.chain_day(expiry_folder, trading_day)
+
+        return {
+            contract: with_time_codes(df)[columns + TIME_CODE_COLUMNS]
+            for contract, df in chain.items()
+        }
+
+    def read_expiry_days(self, expiry_folder, columns):
+        expiry_path = os.path.join(self.config.options_folder, expiry_folder)
+
+        if not os.path.isdir(expiry_path):
+            return {}
+
+        frames = {}
+        for strike in sorted(os.listdir(expiry_path)):
+            for option_type in ["CE", "PE"]:
+                file_path = self.option_file_path(expiry_folder, strike, option_type)
+
+                # logger.info(f"Loading: {file_path}")
+
+                if not os.path.exists(file_path):
+                    continue
+
+                df = read_bars(file_path, columns)
+                df["timestamp"] = pd.to_datetime(df["timestamp"])
+
+                for day, day_df in df.groupby(df["epoch_minute"] // MINUTES_PER_DAY):
+                    frames[(int(strike), option_type, day)] = day_df
+
+        return frames
+
+    def options(self, strategy):
+        key = (feature_set_name(strategy.indicator_params()), *strategy.option_columns)
+
+        if key in self.option_sets:
+            self.option_sets.move_to_end(key)
+            return self.option_sets[key]
+
+        self.option_sets[key] = OptionData(self, strategy)
+        self.raw_columns += [
+            column
+            for column in strategy.option_columns
+            if column not in self.raw_columns
+        ]
+
+        while len(self.option_sets) > OPTION_SETS_SIZE:
+            self.option_sets.popitem(last=False)
+
+        return self.option_sets[key]
+
+
+# Option bars with one strategy's indicator columns, cached per contract-day.
+class OptionData:
+    def __init__(self, market_data, strategy):
+        self.market_data = market_data
+        self.columns = list(strategy.option_columns)
+
+        self.features = FeatureStore(
+            strategy.indicator_params,
+            market_data.source_paths,
+            market_data.config.feature_store,
+        )
+        self.chain_indicators = BatchIndicators(
+            lambda expiry_folder, trading_day: market_data.load_chain_day(
+                expiry_folder, trading_day, self.columns
+            ),
+            strategy.calculate_indicators,
+            strategy.indicator_inputs,
+            store=self.features,
+        )
+        self.expiry_indicators = BatchIndicators(
+            lambda expiry_folder: market_data.load_expiry_days(
+                expiry_folder, self.columns
+            ),
+            strategy.calculate_indicators,
+            strategy.indicator_inputs,
+            store=self.features,
+        )
+        self.cache = OptionDayCache(self.load_option_day)
+
+    def batch_member(self, expiry_folder, strike, option_type, trading_day):
+        if self.market_data.config.options_storage in ("dataset", "cube"):
+            return self.chain_indicators, (
+                (expiry_folder, str(trading_day)),
+                (int(strike), option_type),
+            )
+
+        return self.expiry_indicators, (
+            (expiry_folder,),
+            (int(strike), option_type, epoch_day(trading_day)),
+        )
+
+    def load_option_day(self, expiry_folder, strike, option_type, trading_day):
+        batches, (key, member) = self.batch_member(
+            expiry_folder, strike, option_type, trading_day
+        )
+
+        return batches.get(key, member)
+
+    # One contract-day as {column: array}, or None; used by the vectorized mode.
+    def option_day_arrays(self, expiry_folder, strike, option_type, trading_day):
+        batches, (key, member) = self.batch_member(
+            expiry_folder, strike, option_type, trading_day
+        )
+
+        return batches.arrays(
+            key,
+            member,
+            [column for column in self.columns if column != "timestamp"]
+            + ["epoch_minute"],
+        )
+
+    def bar(self, expiry_folder, strike, option_type, timestamp):
+        bars = self.cache.get_day(expiry_folder, strike, option_type, timestamp.date())
+
+        if bars is None:
+            return None
+
+        bar = bars.get(epoch_minute(timestamp))
+
+        if bar is None:
+            logger.warning(
+                "Data Not Found: %s",
+                self.market_data.option_file_path(expiry_folder, strike, option_type),
+            )
+
+        return bar
@@ -0,0 +1,196 @@
+import logging
+from collections import deque
+
+import numpy as np
+import pyarrow as pa
+
+
+logger = logging.getLogger()
+
+# Labels chosen by the strategies (entry types, exit reasons, sides) are kept as
+# references to the strategy's strings, so any label fits without a width.
+POSITION_DTYPE = np.dtype(
+    [
+        ("entry_timestamp", "M8[ns]"),
+        ("strike", "i8"),
+        ("option_type", "U2"),
+        ("entry_price", "f8"),
+        ("entry_type", "O"),
+        ("status", "?"),
+        ("exit_price", "f8"),
+        ("exit_timestamp", "M8[ns]"),
+        ("exit_reason", "O"),
+    ]
+)
+ORDER_DTYPE = np.dtype(
+    [
+        ("timestamp", "M8[ns]"),
+        ("strike", "i8"),
+        ("option_type", "U2"),
+        ("price", "f8"),
+        ("side", "O"),
+    ]
+)
+LEDGER_CAPACITY = 16
+
+
+# === LEDGER === #
+# A trading day's positions and orders as structured arrays, one row per leg /
+# order, grown by doubling. Open positions are indexed by option type in entry
+# order, so the active leg is found without scanning. position(row) is a
+# record view with attribute access (position.entry_price, .entry_type), which
+# is what Strategy.leg_pnl() and exit_conditions() receive.
+class Ledger:
+    def __init__(self, capacity=LEDGER_CAPACITY):
+        self.position_rows = np.zeros(capacity, POSITION_DTYPE).view(np.recarray)
+        self.order_rows = np.zeros(2 * capacity, ORDER_DTYPE).view(np.recarray)
+        self.position_count = 0
+        self.order_count = 0
+        self.open_rows = {}
+
+    def __len__(self):
+        return self.position_count
+
+    @staticmethod
+    def grow(rows, count):
+        if count < len(rows):
+            return rows
+
+        grown = np.zeros(2 * len(rows), rows.dtype).view(np.recarray)
+        grown[:count] = rows[:count]
+
+        return grown
+
+    def add_order(self, timestamp, strike, option_type, price, side):
+        self.order_rows = self.grow(self.order_rows, self.order_count)
+        self.order_rows[self.order_count] = (
+            timestamp,
+            strike,
+            option_type,
+            price,
+            side,
+        )
+        self.order_count += 1
+
+    def open(self, timestamp, strike, option_type, entry_price, entry_type, side):
+        row = self.position_count
+
+        self.position_rows = self.grow(self.position_rows, row)
+        self.position_rows[row] = (
+            timestamp,
+            strike,
+            option_type,
+            entry_price,
+            entry_type,
+            True,
+            np.nan,
+            np.datetime64("NaT"),
+            None,
+        )
+        self.position_count += 1
+
+        self.open_rows.setdefault(option_type, deque()).append(row)
+        self.add_order(timestamp, strike, option_type, entry_price, side)
+
+        return row
+
+    def close(self, row, exit_price, timestamp, exit_reason, side):
+        position = self.position_rows[row]
+        position.exit_price = exit_price
+        position.exit_timestamp = timestamp
+        position.exit_reason = exit_reason
+        position.status = False
+
+        self.open_rows[position.option_type].remove(row)
+        self.add_order(
+            timestamp, position.strike, position.option_type, exit_price, side
+        )
+
+    # Row of the earliest open position of the option type, or None.
+    def open_position(self, option_type):
+        rows = self.open_rows.get(option_type)
+
+        return rows[0] if rows else None
+
+    def is_open(self, row):
+        return bool(self.position_rows.status[row])
+
+    def position(self, row):
+        return self.position_rows[row]
+
+    def positions(self):
+        return self.position_rows[: self.position_count]
+
+    def orders(self):
+        return self.order_rows[: self.order_count]
+
+    # === EXPORT === #
+    # Whole columns at once, without per-row objects; the results files are
+    # built from the same columns (see engine.runner.positions_frame).
+    def positions_table(self):
+        return rows_table(self.positions())
+
+    def orders_table(self):
+        return rows_table(self.orders())
+
+    # The inverse of positions_table() / orders_table(), for ledgers kept in
+    # the run cache (engine.run_cache).
+    @classmethod
+    def from_tables(cls, positions, orders):
+        ledger = cls(max(len(positions), len(orders), LEDGER_CAPACITY))
+        ledger.position_count = len(positions)
+        ledger.order_count = len(orders)
+
+        for rows, table in [
+            (ledger.position_rows, positions),
+            (ledger.order_rows, orders),
+        ]:
+            for name in table.column_names:
+                rows[name][: len(table)] = table[name].to_numpy(zero_copy_only=False)
+
+        for row in np.flatnonzero(ledger.positions().status):
+            ledger.open_rows.setdefault(
+                ledger.position_rows.option_type[row], deque()
+            ).append(int(row))
+
+        return ledger
+
+
+def rows_table(rows):
+    return pa.table({name: pa.array(rows[name]) for name in rows.dtype.names})
+
+
+# === TRADES === #
+# Returns the ledger rows of the new positions, in leg order.
+def enter_trade(strategy, config, timestamp, legs, bars, entry_type, ledger):
+    logger.info(
+        f"Entry: {timestamp} - {bars[0]['open']}", extra={"market_time": timestamp}
+    )
+
+    rows = []
+    for (strike, option_type), bar in zip(legs, bars):
+        entry_price = bar["open"] * config.slippage_percent + bar["open"]
+        logger.info(f"Entry Price: {entry_price}", extra={"market_time": timestamp})
+
+        rows.append(
+            ledger.open(
+                timestamp,
+                strike,
+                option_type,
+                entry_price,
+                entry_type,
+                strategy.entry_side,
+            )
+        )
+
+    return rows
+
+
+def close_position(strategy, config, ledger, row, price, timestamp, exit_reason):
+    ledger.close(
+        row,
+        price * config.slippage_percent + price,
+        timestamp,
+        exit_reason,
+        strategy.exit_side,
+    )
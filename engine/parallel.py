@@ -0,0 +1,130 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+logger = logging.getLogger()
+
+
+# === CHUNKS === #
+# Consecutive days sharing a nearest expiry go to the same worker, so the
+# expiry's indicator batch is loaded once per chunk instead of once per day.
+def expiry_chunks(trading_days, nearest_expiry):
+    chunks = []
+    chunk_expiry = None
+
+    for trading_day in trading_days:
+        expiry_folder = nearest_expiry(trading_day)
+
+        if not chunks or expiry_folder != chunk_expiry:
+            chunks.append([])
+            chunk_expiry = expiry_folder
+
+        chunks[-1].append(trading_day)
+
+    return chunks
+
+
+# === WORKERS === #
+# Each worker process builds one runner (a DayRunner, or a PortfolioRunner for
+# several strategies) when it starts: spot index, expiries, availability and
+# option caches, reused for every chunk it is given. The runner class is passed
+# in with its arguments and must provide run_isolated(trading_day), flush(),
+# cache_stats() and crashed(trading_day).
+worker_runner = None
+
+
+def init_worker(runner_class, args):
+    global worker_runner
+
+    worker_runner = runner_class(*args)
+
+
+# The chunk's results with the run cache hits and misses of its days.
+def run_chunk(trading_days):
+    results = [worker_runner.run_isolated(trading_day) for trading_day in trading_days]
+    worker_runner.flush()
+
+    return results, worker_runner.cache_stats()
+
+
+# Results of the chunks that finished; None for the chunks lost when a worker
+# process died (which breaks the whole pool). The workers' run cache hits and
+# misses are added to `cache` (the parent's engine.run_cache.RunCache).
+def run_pool(runner_class, args, chunks, workers, cache=None):
+    results = [None] * len(chunks)
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=init_worker, initargs=(runner_class, args)
+        ) as executor:
+            futures = [executor.submit(run_chunk, chunk) for chunk in chunks]
+
+            for i, future in enumerate(futures):
+                try:
+                    results[i], (hits, misses) = future.result()
+                except BrokenProcessPool:
+                    continue
+
+                if cache is not None:
+                    cache.hits += hits
+                    cache.misses += misses
+    except BrokenProcessPool:
+        pass
+
+    return results
+
+
+# Chunks come back in day order. A day that raises is reported by its worker
+# without affecting the rest of the chunk. When a worker process dies outright
+# the pool is lost: the finished chunks are kept and the days without results
+# are run again, one day per task, in a fresh pool of the same size, for as
+# long as that makes progress. Days a round could not finish at all are then
+# run in a pool of their own, so only the days that kill a worker again fail.
+def run_parallel(runner_class, args, chunks, workers=None, cache=None):
+    workers = workers or os.cpu_count()
+    logger.info(f"Workers: {workers} - Chunks: {len(chunks)}")
+
+    results = run_pool(runner_class, args, chunks, workers, cache)
+
+    lost = [
+        trading_day
+        for chunk, result in zip(chunks, results)
+        if result is None
+        for trading_day in chunk
+    ]
+    retried = {}
+
+    while lost:
+        logger.warning(f"Worker crashed, retrying {len(lost)} days")
+
+        day_results = run_pool(
+            runner_class, args, [[trading_day] for trading_day in lost], workers, cache
+        )
+
+        for trading_day, result in zip(lost, day_results):
+            if result is not None:
+                retried[trading_day] = result[0]
+
+        remaining = [trading_day for trading_day in lost if trading_day not in retried]
+
+        if len(remaining) == len(lost):
+            for trading_day in remaining:
+                result = run_pool(runner_class, args, [[trading_day]], 1, cache)[0]
+                retried[trading_day] = (
+                    result[0]
+                    if result is not None
+                    else runner_class.crashed(trading_day)
+                )
+
+            remaining = []
+
+        lost = remaining
+
+    results = [
+        result if result is not None else [retried[day] for day in chunk]
+        for chunk, result in zip(chunks, results)
+    ]
+
+    return [day_result for result in results for day_result in result]
@@ -0,0 +1,167 @@
+import logging
+
+from engine.market_data import MarketData
+from engine.parallel import expiry_chunks, run_parallel
+from engine.results import start_run
+from engine.runner import DayRunner
+
+
+logger = logging.getLogger()
+
+# BacktestConfig fields that pick the market data; every strategy of a
+# portfolio must agree on them to share one data pass.
+DATA_FIELDS = [
+    "nifty_index_file",
+    "options_folder",
+    "options_dataset",
+    "options_cube",
+    "availability_index",
+    "feature_store",
+    "options_storage",
+]
+
+
+# === PORTFOLIO RUNNER === #
+# Several strategies on one MarketData: each trading day's spot bars, chain
+# and availability are read once and every strategy runs on them before the
+# next day is loaded (see MarketData.shared_frames). Each strategy keeps its
+# own DayRunner, so positions, orders and results folders stay separate.
+# `days` has the set of days each strategy runs (see trading_days()); workers
+# are given the parent's.
+class PortfolioRunner:
+    def __init__(self, strategies, market_data=None, days=None):
+        first_config = strategies[0][1]
+
+        for strategy, config in strategies[1:]:
+            for field in DATA_FIELDS:
+                if getattr(config, field) != getattr(first_config, field):
+                    raise ValueError(
+                        f"{strategy.name}: {field} differs from {strategies[0][0].name}"
+                    )
+
+        if market_data is None:
+            market_data = MarketData(first_config)
+
+        self.runners = [
+            DayRunner(strategy, config, market_data) for strategy, config in strategies
+        ]
+        self.days = days
+        self.done = [set() for _ in strategies]
+
+    # Every strategy's days in the range, less the days it already finished
+    # (resumed runs); sets self.days.
+    def trading_days(self, start_date, end_date):
+        self.days = [
+            {
+                trading_day
+                for trading_day in runner.trading_days(start_date, end_date)
+                if str(trading_day) not in done
+            }
+            for runner, done in zip(self.runners, self.done)
+        ]
+
+        return sorted(set().union(*self.days))
+
+    def nearest_expiry(self, trading_day):
+        return self.runners[0].nearest_expiry(trading_day)
+
+    # (trading_day, [DayRunner.run_isolated() result or None per strategy]);
+    # None for a strategy that skips the day (event days) or already did it.
+    def run_isolated(self, trading_day):
+        return trading_day, [
+            runner.run_isolated(trading_day) if trading_day in days else None
+            for runner, days in zip(self.runners, self.days)
+        ]
+
+    def flush(self):
+        for runner in self.runners:
+            runner.flush()
+
+    # Drops the parquet parts no finished day names (see DayRunner.finished_days).
+    def finished_days(self):
+        return [runner.finished_days() for runner in self.runners]
+
+    def cache_stats(self):
+        stats = [runner.cache_stats() for runner in self.runners]
+
+        return sum(hits for hits, _ in stats), sum(misses for _, misses in stats)
+
+    @staticmethod
+    def crashed(trading_day):
+        return trading_day, None
+
+    def log_stats(self):
+        for runner in self.runners:
+            logger.info(f"Strategy: {runner.strategy.name}")
+            runner.log_stats()
+
+
+# === BACKTESTING FUNCTION === #
+# run_backtest() for [(strategy, config)] in one data pass, checkpointed per
+# chunk of days the same way; with resume=True each strategy skips the days it
+# already finished. Returns one list of (trading_day, ledger, error) per
+# strategy, in input order.
+def run_portfolio(
+    strategies, start_date, end_date, market_data=None, workers=1, resume=False
+):
+    if market_data is None:
+        market_data = MarketData(strategies[0][1])
+
+    strategies = [
+        (
+            strategy,
+            start_run(strategy, config, start_date, end_date, market_data, resume),
+        )
+        for strategy, config in strategies
+    ]
+    runner = PortfolioRunner(strategies, market_data)
+
+    trading_days = runner.trading_days(start_date, end_date)
+    logger.info(f"Portfolio: {len(strategies)} strategies - {len(trading_days)} days")
+
+    if resume:
+        runner.done = [set(done) for done in runner.finished_days()]
+        total_days = len(trading_days)
+        trading_days = runner.trading_days(start_date, end_date)
+        logger.info(f"Resume: {total_days - len(trading_days)} days already done")
+
+    chunks = expiry_chunks(trading_days, runner.nearest_expiry)
+
+    if workers == 1:
+        day_results = []
+
+        for chunk in chunks:
+            day_results += [runner.run_isolated(trading_day) for trading_day in chunk]
+            runner.flush()
+
+        runner.log_stats()
+    else:
+        day_results = run_parallel(
+            PortfolioRunner, (strategies, None, runner.days), chunks, workers
+        )
+
+    # Drops the parts a crashed worker wrote before checkpointing its days.
+    if any(config.results_format == "parquet" for _, config in strategies):
+        runner.finished_days()
+
+    results = [[] for _ in strategies]
+
+    for trading_day, day_result in day_results:
+        if day_result is None:
+            day_result = [
+                DayRunner.crashed(trading_day) if trading_day in days else None
+                for days in runner.days
+            ]
+
+        for i, strategy_result in enumerate(day_result):
+            if strategy_result is None:
+                continue
+
+            if strategy_result[2] is not None:
+                logger.error(
+                    f"Failed {strategies[i][0].name} {trading_day}: {strategy_result[2]}"
+                )
+
+            results[i].append(strategy_result)
+
+    return results
@@ -0,0 +1,248 @@
+import copy
+import glob
+import json
+import logging
+import os
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from engine.checkpoints import CHECKPOINTS_FOLDER, run_hash, write_atomic
+
+
+logger = logging.getLogger()
+
+RUNS_FOLDER = "runs"
+RUN_METADATA_FILE = "run.json"
+RUN_METADATA_KEY = b"run"
+RUN_DAYS_KEY = b"days"
+RESULTS_FLUSH_ROWS = 50000
+
+# Column types of the results files (see engine.runner.positions_frame /
+# orders_frame); "Entry Type" is only present for strategies recording it.
+RESULTS_FIELDS = {
+    "positions": [
+        ("Entry Timestamp", pa.timestamp("ns")),
+        ("Strike", pa.int64()),
+        ("Option Type", pa.string()),
+        ("Entry Price", pa.float64()),
+        ("Entry Type", pa.string()),
+        ("Exit Price", pa.float64()),
+        ("Exit Timestamp", pa.timestamp("ns")),
+        ("Exit Reason", pa.string()),
+        ("PnL per Lot", pa.float64()),
+        ("Hold Time", pa.float64()),
+        ("Lot Size", pa.int64()),
+        ("Quantity", pa.int64()),
+        ("Cost per Lot", pa.float64()),
+        ("Net PnL per Lot", pa.float64()),
+    ],
+    "orders": [
+        ("Timestamp", pa.timestamp("ns")),
+        ("Strike", pa.int64()),
+        ("Option Type", pa.string()),
+        ("Price", pa.float64()),
+        ("Side", pa.string()),
+        ("Lot Size", pa.int64()),
+        ("Quantity", pa.int64()),
+    ],
+}
+
+
+# === RUN METADATA === #
+def run_metadata(strategy, config, start_date, end_date, data_version):
+    return {
+        "run_id": config.run_id,
+        "run_hash": run_hash(strategy, config),
+        "strategy": strategy.name,
+        "parameters": vars(strategy),
+        "config": vars(config),
+        "start_date": str(start_date),
+        "end_date": str(end_date),
+        "data_version": data_version,
+        "created": pd.Timestamp.now().isoformat(),
+    }
+
+
+# Gives a parquet run its id and folder and writes run.json there; a resumed
+# run continues the latest run of the same strategy, parameters and config.
+# Returns the config copy the run's DayRunners (and workers) use.
+def start_run(strategy, config, start_date, end_date, market_data, resume=False):
+    if config.results_format != "parquet":
+        return config
+
+    config = copy.copy(config)
+
+    if resume:
+        current_hash = run_hash(strategy, config)
+
+        for folder in reversed(run_folders(config.results_folder)):
+            metadata = read_run_metadata(folder)
+
+            if metadata.get("run_hash") == current_hash:
+                config.run_id = metadata["run_id"]
+                return config
+
+    config.run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+
+    folder = run_folder(config)
+    os.makedirs(folder, exist_ok=True)
+
+    metadata = run_metadata(
+        strategy, config, start_date, end_date, market_data.data_version()
+    )
+
+    def write(path):
+        with open(path, "w") as f:
+            json.dump(metadata, f, indent=2, default=str)
+
+    write_atomic(os.path.join(folder, RUN_METADATA_FILE), write)
+
+    return config
+
+
+def run_folder(config):
+    return os.path.join(config.results_folder, RUNS_FOLDER, config.run_id)
+
+
+# Per-day checkpoints (engine.checkpoints): next to the per-day CSVs, or inside
+# the parquet run they belong to.
+def checkpoint_folder(config):
+    if config.results_format == "parquet":
+        return os.path.join(run_folder(config), CHECKPOINTS_FOLDER)
+
+    return os.path.join(config.results_folder, CHECKPOINTS_FOLDER)
+
+
+# === RESULTS DATASET === #
+# One Parquet dataset per run instead of a CSV pair per day:
+#
+#   <results_folder>/runs/<run_id>/run.json
+#   <results_folder>/runs/<run_id>/positions/month=2024-05/part-<pid>-<ns>-<n>.parquet
+#   <results_folder>/runs/<run_id>/orders/month=2024-05/part-<pid>-<ns>-<n>.parquet
+#
+# Days are buffered as Arrow tables and written on flush(); each process
+# writes its own parts, so day-parallel workers share the dataset. Part files
+# are written aside and renamed into place and list the days they were flushed
+# with; a flush returns their paths for those days' checkpoints, and parts not
+# confirmed by them are dropped by discard_unfinished().
+class ResultsDataset:
+    def __init__(self, config):
+        self.folder = run_folder(config)
+        self.buffers = {}
+        self.rows = 0
+        self.parts = 0
+
+        with open(os.path.join(self.folder, RUN_METADATA_FILE)) as f:
+            self.metadata = f.read()
+
+    def add(self, trading_day, positions, orders):
+        month = pd.Timestamp(trading_day).strftime("%Y-%m")
+
+        for kind, frame in [("positions", positions), ("orders", orders)]:
+            schema = pa.schema(
+                [field for field in RESULTS_FIELDS[kind] if field[0] in frame.columns]
+            )
+            table = pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+
+            self.buffers.setdefault((kind, month), []).append(table)
+            self.rows += len(table)
+
+    def flush(self, trading_days):
+        metadata = {
+            RUN_METADATA_KEY: self.metadata,
+            RUN_DAYS_KEY: json.dumps([str(day) for day in trading_days]),
+        }
+        parts = []
+
+        for (kind, month), tables in self.buffers.items():
+            folder = os.path.join(self.folder, kind, f"month={month}")
+            os.makedirs(folder, exist_ok=True)
+
+            path = os.path.join(
+                folder, f"part-{os.getpid()}-{time.time_ns()}-{self.parts}.parquet"
+            )
+            self.parts += 1
+
+            table = pa.concat_tables(tables).replace_schema_metadata(metadata)
+            write_atomic(path, lambda temp_path: pq.write_table(table, temp_path))
+            parts.append(os.path.relpath(path, self.folder))
+
+        self.buffers = {}
+        self.rows = 0
+
+        return parts
+
+
+def result_parts(folder):
+    return [
+        os.path.relpath(path, folder)
+        for path in glob.glob(os.path.join(folder, "*", "month=*", "part-*.parquet"))
+    ]
+
+
+def part_days(folder, part):
+    metadata = pq.read_schema(os.path.join(folder, part)).metadata
+
+    return json.loads(metadata[RUN_DAYS_KEY])
+
+
+# A part is kept when every day it was flushed with is finished and names it;
+# anything else (a flush cut short, a crashed worker whose days were run again,
+# a day with changed inputs) is deleted, and the finished days that shared a
+# part with it are forgotten so they run again. `done` maps finished days to
+# their parts. Returns the days whose results are complete.
+def discard_unfinished(folder, done, checkpoints):
+    parts = {part: part_days(folder, part) for part in result_parts(folder)}
+    done = dict(done)
+
+    while True:
+        stale = [
+            part
+            for part, days in parts.items()
+            if not all(part in done.get(day, ()) for day in days)
+        ]
+        lost = [
+            day
+            for day, day_parts in done.items()
+            if not day_parts <= parts.keys() - set(stale)
+        ]
+
+        for part in stale:
+            logger.warning(f"Discarding unfinished results: {part}")
+            os.remove(os.path.join(folder, part))
+            del parts[part]
+
+        for day in lost:
+            del done[day]
+            checkpoints.clear(day)
+
+        if not stale and not lost:
+            break
+
+    return set(done)
+
+
+def run_folders(results_folder):
+    return sorted(glob.glob(os.path.join(results_folder, RUNS_FOLDER, "*")))
+
+
+def read_run_metadata(folder):
+    with open(os.path.join(folder, RUN_METADATA_FILE)) as f:
+        return json.load(f)
+
+
+# A run's positions or orders in one columnar read, in the row order the
+# per-day CSVs have (legs of a trade stay next to each other).
+def read_results(folder, kind="positions"):
+    path = os.path.join(folder, kind)
+
+    if not os.path.isdir(path):
+        return pd.DataFrame(columns=[name for name, _ in RESULTS_FIELDS[kind]])
+
+    df = pq.read_table(path).drop_columns(["month"]).to_pandas()
+    timestamp = "Entry Timestamp" if kind == "positions" else "Timestamp"
+
+    return df.sort_values(by=timestamp, kind="stable").reset_index(drop=True)
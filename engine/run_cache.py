@@ -0,0 +1,362 @@
+import glob
+import hashlib
+import inspect
+import json
+import logging
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from engine.checkpoints import write_atomic
+from engine.market_data import MarketData
+from engine.orders import Ledger
+from engine.runner import DayRunner, positions_frame, run_backtest
+from engine.sweep import trade_log, trade_stats
+from indicators import INDICATOR_VERSION
+from summary import combine_leg_positions
+
+
+logger = logging.getLogger()
+
+RUN_CACHE = "database/run_cache/"
+RUN_CACHE_MAX_BYTES = 1024**3
+RUN_CACHE_VERSION = 1  # bump when an engine change alters trades
+CACHE_METADATA_KEY = b"run_cache"
+
+# Config fields that only say where results go, not what they are.
+OUTPUT_FIELDS = ["results_folder", "results_format", "run_id", "feature_store"]
+
+
+# === KEYS === #
+# The strategy code version is its class source (and the base classes'), with
+# the indicator and engine versions; editing a condition or a period default
+# gives new keys without bumping anything by hand.
+def code_version(strategy):
+    digest = hashlib.sha1(f"{RUN_CACHE_VERSION}:{INDICATOR_VERSION}".encode())
+
+    for cls in type(strategy).__mro__[:-1]:
+        digest.update(inspect.getsource(cls).encode())
+
+    return digest.hexdigest()
+
+
+def run_settings(strategy, config):
+    return {
+        "strategy": type(strategy).__name__,
+        "code": code_version(strategy),
+        "parameters": vars(strategy),
+        "config": {
+            name: value
+            for name, value in vars(config).items()
+            if name not in OUTPUT_FIELDS
+        },
+    }
+
+
+def settings_key(strategy, config):
+    return hash_key(run_settings(strategy, config))
+
+
+def hash_key(value):
+    return hashlib.sha1(
+        json.dumps(value, sort_keys=True, default=json_value).encode()
+    ).hexdigest()
+
+
+def json_value(value):
+    return value.item() if isinstance(value, np.generic) else str(value)
+
+
+# === RUN CACHE === #
+# Content-addressed results, two kinds of entries:
+#
+#   <root>/days/<key>.positions.parquet  one trading day's ledger (+ .orders),
+#                                        keyed by settings, day and the day's
+#                                        input files (MarketData.day_version)
+#   <root>/runs/<key>.positions.parquet  a whole run's positions and stats,
+#                                        keyed by settings and its day keys
+#
+# A run hit returns without simulating anything; on a miss the run is
+# backtested with the day entries, so an overlapping date range only simulates
+# the days it does not share. Entry metadata (settings, days, stats) is kept in
+# the positions file's schema metadata, which is written last, so an entry
+# exists once that file does. Every hit touches it, and evict() drops the least
+# recently used entries until the cache fits in max_bytes.
+class RunCache:
+    def __init__(self, root=RUN_CACHE, max_bytes=RUN_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, kind, key, table="positions"):
+        return os.path.join(self.root, f"{kind}s", f"{key}.{table}.parquet")
+
+    def write(self, kind, key, tables, metadata):
+        os.makedirs(os.path.dirname(self.path(kind, key)), exist_ok=True)
+
+        # The positions table goes last: it marks the entry complete.
+        for table_name, table in reversed(list(tables.items())):
+            if table_name == "positions":
+                table = table.replace_schema_metadata(
+                    {CACHE_METADATA_KEY: json.dumps(metadata, default=json_value)}
+                )
+
+            write_atomic(
+                self.path(kind, key, table_name),
+                lambda temp_path: pq.write_table(table, temp_path),
+            )
+
+    def read(self, kind, key, table="positions"):
+        try:
+            table = pq.read_table(self.path(kind, key, table))
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        os.utime(self.path(kind, key))
+
+        return table
+
+    def settings_key(self, strategy, config):
+        return settings_key(strategy, config)
+
+    # === DAY ENTRIES === #
+    def day_key(self, settings, trading_day, data_version):
+        return hash_key([settings, str(trading_day), data_version])
+
+    def load_day(self, key):
+        positions = self.read("day", key)
+
+        if positions is None:
+            return None
+
+        return Ledger.from_tables(
+            positions, pq.read_table(self.path("day", key, "orders"))
+        )
+
+    def save_day(self, key, ledger, strategy, trading_day):
+        self.write(
+            "day",
+            key,
+            {"positions": ledger.positions_table(), "orders": ledger.orders_table()},
+            {
+                "kind": "day",
+                "strategy": strategy.name,
+                "start": str(trading_day),
+                "end": str(trading_day),
+                "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            },
+        )
+
+    # === RUN ENTRIES === #
+    def run_key(self, settings, day_keys):
+        return hash_key([settings, day_keys])
+
+    # (positions, stats) or None.
+    def load_run(self, key):
+        positions = self.read("run", key)
+
+        if positions is None:
+            return None
+
+        metadata = json.loads(positions.schema.metadata[CACHE_METADATA_KEY])
+
+        return positions.to_pandas(), metadata["stats"]
+
+    def save_run(self, key, positions, stats, metadata):
+        self.write(
+            "run",
+            key,
+            {"positions": pa.Table.from_pandas(positions, preserve_index=False)},
+            {
+                "kind": "run",
+                **metadata,
+                "stats": stats,
+                "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            },
+        )
+
+    # === MAINTENANCE === #
+    # {(kind, key): [files]} of every entry, complete or not.
+    def entry_files(self):
+        entries = {}
+
+        for path in glob.glob(os.path.join(self.root, "*s", "*.parquet")):
+            kind = os.path.basename(os.path.dirname(path))[:-1]
+            key = os.path.basename(path).split(".")[0]
+            entries.setdefault((kind, key), []).append(path)
+
+        return entries
+
+    def metadata(self, kind, key):
+        schema = pq.read_schema(self.path(kind, key))
+
+        return json.loads(schema.metadata[CACHE_METADATA_KEY])
+
+    # One row per entry, most recently used first.
+    def entries(self):
+        rows = []
+
+        for (kind, key), paths in self.entry_files().items():
+            if not os.path.exists(self.path(kind, key)):
+                continue
+
+            metadata = self.metadata(kind, key)
+            rows.append(
+                {
+                    "Kind": kind,
+                    "Key": key,
+                    "Strategy": metadata.get("strategy"),
+                    "Start": metadata.get("start"),
+                    "End": metadata.get("end"),
+                    "Size": sum(os.path.getsize(path) for path in paths),
+                    "Last Used": pd.Timestamp.fromtimestamp(
+                        os.path.getmtime(self.path(kind, key))
+                    ).floor("s"),
+                }
+            )
+
+        columns = ["Kind", "Key", "Strategy", "Start", "End", "Size", "Last Used"]
+
+        return (
+            pd.DataFrame(rows, columns=columns)
+            .sort_values(by="Last Used", ascending=False)
+            .reset_index(drop=True)
+        )
+
+    # (kind, key) of the complete entries whose key starts with `prefix`.
+    def find(self, prefix):
+        return [
+            (kind, key)
+            for kind, key in self.entry_files()
+            if key.startswith(prefix) and os.path.exists(self.path(kind, key))
+        ]
+
+    def remove(self, kind, key):
+        for table in ["positions", "orders"]:
+            if os.path.exists(self.path(kind, key, table)):
+                os.remove(self.path(kind, key, table))
+
+    def size(self):
+        return sum(
+            os.path.getsize(path)
+            for paths in self.entry_files().values()
+            for path in paths
+        )
+
+    # Least recently used entries go first; incomplete entries (no positions
+    # file) count as the oldest.
+    def evict(self):
+        entries = []
+
+        for (kind, key), paths in self.entry_files().items():
+            positions = self.path(kind, key)
+            last_used = os.path.getmtime(positions) if positions in paths else 0
+            entries.append(
+                (last_used, kind, key, sum(os.path.getsize(path) for path in paths))
+            )
+
+        total = sum(size for *_, size in entries)
+        evicted = 0
+
+        for _, kind, key, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+
+            self.remove(kind, key)
+            total -= size
+            evicted += 1
+
+        if evicted:
+            logger.info(f"Run Cache: evicted {evicted} entries")
+
+        return evicted
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+
+# === CACHED BACKTEST === #
+# run_backtest() through the run cache: (positions, stats) of the run, where
+# positions has the per-leg rows of the results files and stats the
+# calculate_stats_from_trades() metrics (see engine.sweep.trade_stats). A run
+# with failed days is returned but not stored.
+def cached_backtest(
+    strategy,
+    config,
+    start_date,
+    end_date,
+    cache=None,
+    market_data=None,
+    workers=1,
+):
+    if cache is None:
+        cache = RunCache()
+
+    if market_data is None:
+        market_data = MarketData(config)
+
+    settings = settings_key(strategy, config)
+    runner = DayRunner(strategy, config, market_data)
+    trading_days = runner.trading_days(start_date, end_date)
+    day_keys = [
+        cache.day_key(
+            settings,
+            trading_day,
+            market_data.day_version(runner.nearest_expiry(trading_day), trading_day),
+        )
+        for trading_day in trading_days
+    ]
+    key = cache.run_key(settings, day_keys)
+
+    entry = cache.load_run(key)
+
+    if entry is not None:
+        logger.info(f"Run Cache: hit {key}")
+        cache.evict()
+        return entry
+
+    results = run_backtest(
+        strategy,
+        config,
+        start_date,
+        end_date,
+        market_data,
+        workers,
+        cache=cache,
+    )
+
+    frames = [
+        positions_frame(strategy, config, ledger) for _, ledger, _ in results if ledger
+    ]
+    positions = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    stats = trade_stats(
+        trade_log(
+            [combine_leg_positions(frame) for frame in frames],
+            runner.expiry_calendar,
+        )
+    )
+
+    if all(error is None for *_, error in results):
+        cache.save_run(
+            key,
+            positions,
+            stats,
+            {
+                "strategy": strategy.name,
+                "start": str(trading_days[0]) if trading_days else None,
+                "end": str(trading_days[-1]) if trading_days else None,
+                "days": len(trading_days),
+                "settings": run_settings(strategy, config),
+            },
+        )
+
+    cache.evict()
+
+    return positions, stats
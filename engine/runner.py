@@ -0,0 +1,484 @@
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+from engine.checkpoints import Checkpoints, day_key, run_hash, write_atomic
+from engine.event_log import bar_logger, bar_sampler
+from engine.market_data import MarketData
+from engine.orders import Ledger, enter_trade
+from engine.parallel import expiry_chunks, run_parallel
+from engine.results import (
+    RESULTS_FLUSH_ROWS,
+    ResultsDataset,
+    checkpoint_folder,
+    discard_unfinished,
+    run_folder,
+    start_run,
+)
+from engine.vectorized import TradingSession, exit_trade, vectorized_day
+from expiry_calendar import ExpiryCalendar
+from market_time import MINUTES_PER_DAY, day_minute, epoch_day
+
+
+logger = logging.getLogger()
+
+
+# === FILTER TRADING DAYS === #
+def select_trading_days(spot_index, config, start_date, end_date):
+    trading_days = [
+        day
+        for day in spot_index.trading_days()
+        if day >= pd.Timestamp(start_date).date()
+        and day <= pd.Timestamp(end_date).date()
+    ]
+
+    if not config.event_days_trades:
+        event_days = set(pd.to_datetime(config.event_days_list).date)
+        trading_days = [day for day in trading_days if day not in event_days]
+
+    return trading_days
+
+
+# === SAVE RESULTS === #
+# One row per leg, as written to {day}_positions.csv, computed column-wise
+# from the ledger.
+def positions_frame(strategy, config, ledger):
+    positions = ledger.positions()
+    lot_size = config.lot_size
+
+    pnl_per_lot = strategy.leg_pnl(positions, positions.exit_price) * lot_size
+    cost_per_lot = positions.entry_price * lot_size * 0.002
+
+    columns = {
+        "Entry Timestamp": positions.entry_timestamp,
+        "Strike": positions.strike,
+        "Option Type": positions.option_type,
+        "Entry Price": positions.entry_price,
+    }
+
+    if strategy.record_entry_type:
+        columns["Entry Type"] = positions.entry_type
+
+    columns.update(
+        {
+            "Exit Price": positions.exit_price,
+            "Exit Timestamp": positions.exit_timestamp,
+            "Exit Reason": positions.exit_reason,
+            "PnL per Lot": pnl_per_lot,
+            "Hold Time": (positions.exit_timestamp - positions.entry_timestamp)
+            / np.timedelta64(1, "m"),
+            "Lot Size": lot_size,
+            "Quantity": 1,
+            "Cost per Lot": cost_per_lot,
+            "Net PnL per Lot": pnl_per_lot - cost_per_lot,
+        }
+    )
+
+    return pd.DataFrame(columns, index=pd.RangeIndex(len(positions)))
+
+
+def orders_frame(config, ledger):
+    orders = ledger.orders()
+
+    return pd.DataFrame(
+        {
+            "Timestamp": orders.timestamp,
+            "Strike": orders.strike,
+            "Option Type": orders.option_type,
+            "Price": orders.price,
+            "Side": orders.side,
+            "Lot Size": config.lot_size,
+            "Quantity": 1,
+        },
+        index=pd.RangeIndex(len(orders)),
+    )
+
+
+def save_results(strategy, config, ledger, trading_day):
+    logger.info(f"Saving Results: {trading_day}")
+
+    if not ledger.position_count and not ledger.order_count:
+        return
+
+    os.makedirs(config.results_folder, exist_ok=True)
+
+    positions_df = positions_frame(strategy, config, ledger)
+    orders_df = orders_frame(config, ledger)
+
+    write_atomic(
+        f"{config.results_folder}/{trading_day}_positions.csv",
+        lambda path: positions_df.to_csv(path, index=False),
+    )
+    write_atomic(
+        f"{config.results_folder}/{trading_day}_orders.csv",
+        lambda path: orders_df.to_csv(path, index=False),
+    )
+
+
+# === TRADING DAY === #
+# Per minute: pick the legs and load their bars (skipping the minute when any
+# is missing), then enter when flat and before the cutoff. A new trade's exit
+# is resolved right away from the forward paths of its legs (see
+# engine.vectorized.resolve_exit) and the loop resumes after it.
+def backtest_day(
+    strategy,
+    config,
+    options,
+    availability,
+    trading_day,
+    spot_day,
+    expiry_folder,
+    entry_cutoff_minute,
+):
+    ledger = Ledger()
+    session = None
+    resume = 0
+
+    for index, (timestamp, close, minute) in enumerate(spot_day.bars()):
+        if index < resume:
+            continue
+
+        bar_sampler.next_bar(timestamp)
+        bar_logger.info("Processing: %s - %s", timestamp, close)
+
+        legs = strategy.select_legs(close)
+
+        if availability is not None and not availability.has_bars(
+            expiry_folder, list(legs.values()), timestamp
+        ):
+            continue
+
+        bars = {
+            name: options.bar(expiry_folder, strike, option_type, timestamp)
+            for name, (strike, option_type) in legs.items()
+        }
+
+        if any(bar is None for bar in bars.values()):
+            continue
+
+        signals = strategy.signals(bars)
+
+        if bar_sampler.sampled:
+            strategy.log_bars(bars, signals)
+
+        bar_logger.info("Positions: %s", ledger.position_count)
+        bar_logger.info("Orders: %s", ledger.order_count)
+
+        # === ENTRY === #
+        if minute >= entry_cutoff_minute:
+            continue
+
+        entry = strategy.entry(bars, signals)
+
+        if entry is None:
+            continue
+
+        entry_type, names = entry
+        trade = enter_trade(
+            strategy,
+            config,
+            timestamp,
+            [legs[name] for name in names],
+            [bars[name] for name in names],
+            entry_type,
+            ledger,
+        )
+
+        # === EXIT === #
+        if session is None:
+            session = TradingSession(
+                strategy,
+                config,
+                options,
+                availability,
+                trading_day,
+                spot_day,
+                expiry_folder,
+            )
+
+        resume = exit_trade(strategy, config, session, ledger, trade, index + 1)
+
+        # Still open at the end of the session.
+        if resume is None:
+            break
+
+    return ledger
+
+
+# === DAY RUNNER === #
+# Loads the spot index, expiries and availability once and runs single trading
+# days, saving each day's results. One per process in the day-parallel mode.
+class DayRunner:
+    def __init__(self, strategy, config, market_data=None, cache=None):
+        if market_data is None:
+            market_data = MarketData(config)
+
+        self.strategy = strategy
+        self.config = config
+        self.market_data = market_data
+        self.options = market_data.options(strategy)
+        self.cache = cache  # engine.run_cache.RunCache
+        self.cache_settings = None
+        self.cache_counts = (0, 0) if cache is None else (cache.hits, cache.misses)
+        self.results = None
+        self.checkpoints = None
+        self.run_hash = None
+        self.pending = []  # (trading_day, key) saved but not flushed yet
+
+        self.spot_index = market_data.load_spot_index()
+        logger.info(f"Nifty Index Loaded: {len(self.spot_index)}")
+
+        self.expiry_calendar = ExpiryCalendar(market_data.expiry_folders())
+        logger.info(f"Expiry Folders: {len(self.expiry_calendar)}")
+
+        self.availability = market_data.load_availability()
+        logger.info(f"Availability Index: {self.availability is not None}")
+
+        self.run_day = vectorized_day if config.mode == "vectorized" else backtest_day
+
+    def trading_days(self, start_date, end_date):
+        return select_trading_days(self.spot_index, self.config, start_date, end_date)
+
+    def nearest_expiry(self, trading_day):
+        return self.expiry_calendar.nearest(pd.to_datetime(trading_day))
+
+    def trades(self, trading_day):
+        bar_sampler.start_day(trading_day)
+        logger.info(f"Processing: {trading_day}")
+
+        spot_day = self.spot_index.day(trading_day, self.config.start_time)
+        entry_cutoff_minute = epoch_day(trading_day) * MINUTES_PER_DAY + day_minute(
+            self.config.entry_cutoff
+        )
+
+        logger.info(f"Nifty Index: {len(spot_day)}")
+
+        nearest_expiry_folder = self.nearest_expiry(trading_day)
+        logger.info(f"Nearest Expiry: {nearest_expiry_folder}")
+
+        cache_key = self.cache_key(trading_day, nearest_expiry_folder)
+        ledger = None if cache_key is None else self.cache.load_day(cache_key)
+
+        if ledger is not None:
+            logger.info(f"Run Cache: {cache_key}")
+        else:
+            ledger = self.run_day(
+                self.strategy,
+                self.config,
+                self.options,
+                self.availability,
+                trading_day,
+                spot_day,
+                nearest_expiry_folder,
+                entry_cutoff_minute,
+            )
+
+            if cache_key is not None:
+                self.cache.save_day(cache_key, ledger, self.strategy, trading_day)
+
+        logger.info(f"Positions: {ledger.position_count}")
+        logger.info(f"Orders: {ledger.order_count}")
+
+        return ledger
+
+    # Day entry of the run cache, or None without a cache.
+    def cache_key(self, trading_day, expiry_folder):
+        if self.cache is None:
+            return None
+
+        if self.cache_settings is None:
+            self.cache_settings = self.cache.settings_key(self.strategy, self.config)
+
+        return self.cache.day_key(
+            self.cache_settings,
+            trading_day,
+            self.market_data.day_version(expiry_folder, trading_day),
+        )
+
+    # === CHECKPOINTS === #
+    def load_checkpoints(self):
+        if self.checkpoints is None:
+            self.run_hash = run_hash(self.strategy, self.config)
+            self.checkpoints = Checkpoints(checkpoint_folder(self.config))
+
+        return self.checkpoints
+
+    # A day's key covers the strategy, parameters and config and the files its
+    # bars come from, so changed inputs invalidate the day.
+    def checkpoint_key(self, trading_day):
+        self.load_checkpoints()
+
+        return day_key(
+            self.run_hash,
+            self.market_data.day_version(self.nearest_expiry(trading_day), trading_day),
+        )
+
+    # {trading_day: parquet parts} of the days checkpointed under their
+    # current key. For parquet runs, parts no such day names (a flush cut
+    # short, a crashed worker, changed inputs) are deleted, and the days that
+    # shared a part with them are forgotten and run again.
+    def finished_days(self):
+        checkpoints = self.load_checkpoints()
+        done = {}
+
+        for trading_day in checkpoints.days():
+            record = checkpoints.record(trading_day)
+
+            if record is not None and record["key"] == self.checkpoint_key(trading_day):
+                done[trading_day] = set(record.get("parts", []))
+
+        if self.config.results_format == "parquet":
+            kept = discard_unfinished(run_folder(self.config), done, checkpoints)
+            done = {trading_day: done[trading_day] for trading_day in kept}
+
+        return done
+
+    def unfinished_days(self, trading_days):
+        done = self.finished_days()
+
+        return [
+            trading_day for trading_day in trading_days if str(trading_day) not in done
+        ]
+
+    def run(self, trading_day):
+        key = self.checkpoint_key(trading_day)
+        ledger = self.trades(trading_day)
+
+        if self.config.results_format == "parquet":
+            self.save_dataset(ledger, trading_day)
+            self.pending.append((trading_day, key))
+
+            if self.results is not None and self.results.rows >= RESULTS_FLUSH_ROWS:
+                self.flush()
+        else:
+            save_results(self.strategy, self.config, ledger, trading_day)
+            self.checkpoints.mark(trading_day, key)
+
+        return ledger
+
+    def save_dataset(self, ledger, trading_day):
+        logger.info(f"Saving Results: {trading_day}")
+
+        if not ledger.position_count and not ledger.order_count:
+            return
+
+        if self.results is None:
+            self.results = ResultsDataset(self.config)
+
+        self.results.add(
+            trading_day,
+            positions_frame(self.strategy, self.config, ledger),
+            orders_frame(self.config, ledger),
+        )
+
+    # Writes the buffered parquet results, then checkpoints their days with the
+    # parts holding them; called after each chunk of days.
+    def flush(self):
+        parts = []
+
+        if self.results is not None:
+            parts = self.results.flush([trading_day for trading_day, _ in self.pending])
+
+        for trading_day, key in self.pending:
+            self.checkpoints.mark(trading_day, key, parts)
+
+        self.pending = []
+
+    # (trading_day, ledger, error); a failing day is reported and skipped
+    # without affecting the others.
+    def run_isolated(self, trading_day):
+        try:
+            return trading_day, self.run(trading_day), None
+        except Exception as e:
+            return trading_day, Ledger(), f"{type(e).__name__}: {e}"
+
+    @staticmethod
+    def crashed(trading_day):
+        return trading_day, Ledger(), "worker process crashed"
+
+    # (hits, misses) of the run cache since the last call; workers report
+    # theirs after each chunk (see engine.parallel.run_pool).
+    def cache_stats(self):
+        if self.cache is None:
+            return 0, 0
+
+        hits, misses = self.cache_counts
+        self.cache_counts = (self.cache.hits, self.cache.misses)
+
+        return self.cache.hits - hits, self.cache.misses - misses
+
+    def log_stats(self):
+        logger.info(f"Option Cache: {self.options.cache.stats()}")
+        logger.info(f"Feature Store: {self.options.features.stats()}")
+
+        if self.cache is not None:
+            logger.info(f"Run Cache: {self.cache.stats()}")
+
+        if self.availability is not None:
+            logger.info(f"Data Coverage: {self.availability.coverage()}")
+
+
+# === BACKTESTING FUNCTION === #
+# The day loop shared by every strategy; config.mode picks the bar loop
+# (backtest_day) or the vectorized session scan (engine.vectorized). With
+# workers > 1 the trading days are spread over a process pool (see
+# engine.parallel). Finished days are checkpointed after each chunk of days;
+# with resume=True the days already finished under the same strategy,
+# parameters, config and input data are skipped (see engine.checkpoints).
+# With a RunCache (engine.run_cache) days simulated before under the same
+# settings and input data are taken from the cache instead. Returns
+# [(trading_day, ledger, error)] for the days run, in day order (see
+# engine.orders.Ledger).
+def run_backtest(
+    strategy,
+    config,
+    start_date,
+    end_date,
+    market_data=None,
+    workers=1,
+    resume=False,
+    cache=None,
+):
+    if market_data is None:
+        market_data = MarketData(config)
+
+    config = start_run(strategy, config, start_date, end_date, market_data, resume)
+    runner = DayRunner(strategy, config, market_data, cache)
+
+    trading_days = runner.trading_days(start_date, end_date)
+    logger.info(f"Trading Days: {len(trading_days)}")
+
+    if resume:
+        total_days = len(trading_days)
+        trading_days = runner.unfinished_days(trading_days)
+        logger.info(f"Resume: {total_days - len(trading_days)} days already done")
+
+    chunks = expiry_chunks(trading_days, runner.nearest_expiry)
+
+    if workers == 1:
+        results = []
+
+        for chunk in chunks:
+            results += [runner.run_isolated(trading_day) for trading_day in chunk]
+            runner.flush()
+
+        runner.log_stats()
+    else:
+        results = run_parallel(
+            DayRunner, (strategy, config, None, cache), chunks, workers, cache
+        )
+
+    # Drops the parts a crashed worker wrote before checkpointing its days.
+    if config.results_format == "parquet":
+        runner.finished_days()
+
+    for trading_day, _, error in results:
+        if error is not None:
+            logger.error(f"Failed {trading_day}: {error}")
+
+    if cache is not None:
+        cache.evict()
+
+    return results
@@ -0,0 +1,314 @@
+import numpy as np
+
+from engine.event_log import bar_logger
+from engine.strategy import Strategy
+from indicators import adx, atr, bollinger_bands, ema, rsi, vwap
+from streaming_indicators import ADX, ATR, EMA, RSI, VWAP, BollingerBands, IndicatorSet
+
+
+def atm_strike(close):
+    return round(close / 50) * 50
+
+
+# np.round rounds half to even like round(), so both pick the same strikes.
+def atm_strikes(closes):
+    return np.round(closes / 50).astype(np.int64) * 50
+
+
+# === DIRECTIONAL === #
+# Buys the ATM option in the trend direction plus the opposite OTM option.
+class DirectionalStrategy(Strategy):
+    name = "directional"
+    record_entry_type = True
+
+    def __init__(
+        self,
+        ema_period=30,
+        adx_period=14,
+        adx_entry=25,
+        adx_exit=15,
+        profit_target=0.15,
+        stop_loss=0.08,
+        hold_time=90,
+    ):
+        super().__init__(profit_target, stop_loss, hold_time)
+        self.ema_period = ema_period
+        self.adx_period = adx_period
+        self.adx_entry = adx_entry
+        self.adx_exit = adx_exit
+
+    def calculate_indicators(self, bars):
+        indicators = {"EMA": ema(bars["close"], self.ema_period)}
+        indicators.update(
+            adx(bars["high"], bars["low"], bars["close"], self.adx_period)
+        )
+        indicators["VWAP"] = vwap(
+            bars["high"], bars["low"], bars["close"], bars["volume"]
+        )
+
+        return indicators
+
+    def indicator_params(self):
+        return {
+            "EMA": {"span": self.ema_period},
+            "ADX": {"period": self.adx_period},
+            "VWAP": {},
+        }
+
+    def streaming_indicators(self):
+        return IndicatorSet(
+            ema=EMA(self.ema_period), adx=ADX(self.adx_period), vwap=VWAP()
+        )
+
+    def select_legs(self, close):
+        atm = atm_strike(close)
+        otm = atm + 50
+        bar_logger.info("ATM: %s, OTM: %s", atm, otm)
+
+        return {
+            "atm_ce": (atm, "CE"),
+            "atm_pe": (atm, "PE"),
+            "otm_ce": (otm, "CE"),
+            "otm_pe": (otm, "PE"),
+        }
+
+    def session_legs(self, closes):
+        atm = atm_strikes(closes)
+        otm = atm + 50
+
+        return {
+            "atm_ce": (atm, "CE"),
+            "atm_pe": (atm, "PE"),
+            "otm_ce": (otm, "CE"),
+            "otm_pe": (otm, "PE"),
+        }
+
+    def log_bars(self, bars, signals):
+        for name, label in [("atm_ce", "ATM CE"), ("atm_pe", "ATM PE")]:
+            bar = bars[name]
+            bar_logger.info(
+                "%s Close: %s - ADX: %s - EMA: %s - VWAP: %s",
+                label,
+                bar["close"],
+                bar["ADX"],
+                bar["EMA"],
+                bar["VWAP"],
+            )
+
+    def entry_conditions(self, bars, signals):
+        atm_ce, atm_pe = bars["atm_ce"], bars["atm_pe"]
+        otm_ce, otm_pe = bars["otm_ce"], bars["otm_pe"]
+
+        bullish = (
+            (atm_ce["open"] > atm_ce["EMA"])
+            & (atm_ce["ADX"] > self.adx_entry)
+            & (atm_ce["+DI"] > atm_ce["-DI"])
+            & (atm_ce["open"] > atm_ce["VWAP"])
+            & (atm_ce["open"] + otm_pe["open"] > 50)
+        )
+
+        bearish = (
+            (atm_pe["open"] > atm_pe["EMA"])
+            & (atm_pe["ADX"] > self.adx_entry)
+            & (atm_pe["-DI"] > atm_pe["+DI"])
+            & (atm_pe["open"] > atm_pe["VWAP"])
+            & (atm_pe["open"] + otm_ce["open"] > 50)
+        )
+
+        return [
+            ("Bullish", ["atm_ce", "otm_pe"], bullish),
+            ("Bearish", ["atm_pe", "otm_ce"], bearish),
+        ]
+
+    def exit_conditions(self, legs, hold_minutes, signals):
+        call_position, call_option = legs["CE"]
+        put_position, put_option = legs["PE"]
+
+        return [
+            ("Hold Time Exceeded", hold_minutes > self.hold_time),
+            (
+                "Trend Reversal",
+                (
+                    (call_position.entry_type == "Bullish")
+                    & (call_option["ADX"] < self.adx_exit)
+                )
+                | (
+                    (put_position.entry_type == "Bearish")
+                    & (put_option["ADX"] < self.adx_exit)
+                ),
+            ),
+        ]
+
+
+# === MEAN REVERSION === #
+# Sells the ATM straddle when the call is overbought above its upper band.
+class MeanReversionStrategy(Strategy):
+    name = "mean_reversion"
+    entry_side = "SELL"
+    short_premium = True
+    option_columns = ["timestamp", "open", "high", "low", "close"]
+    indicator_inputs = ["close"]
+
+    def __init__(
+        self,
+        bb_period=20,
+        rsi_period=14,
+        rsi_overbought=70,
+        rsi_oversold=30,
+        profit_target=0.2,
+        stop_loss=0.1,
+        hold_time=120,
+    ):
+        super().__init__(profit_target, stop_loss, hold_time)
+        self.bb_period = bb_period
+        self.rsi_period = rsi_period
+        self.rsi_overbought = rsi_overbought
+        self.rsi_oversold = rsi_oversold
+
+    def calculate_indicators(self, bars):
+        indicators = bollinger_bands(bars["close"], self.bb_period)
+        indicators["RSI"] = rsi(bars["close"], self.rsi_period)
+
+        return indicators
+
+    def indicator_params(self):
+        return {
+            "BollingerBands": {"period": self.bb_period},
+            "RSI": {"period": self.rsi_period},
+        }
+
+    def streaming_indicators(self):
+        return IndicatorSet(
+            bollinger_bands=BollingerBands(self.bb_period), rsi=RSI(self.rsi_period)
+        )
+
+    def select_legs(self, close):
+        atm = atm_strike(close)
+        bar_logger.info("ATM: %s", atm)
+
+        return {"atm_ce": (atm, "CE"), "atm_pe": (atm, "PE")}
+
+    def session_legs(self, closes):
+        atm = atm_strikes(closes)
+
+        return {"atm_ce": (atm, "CE"), "atm_pe": (atm, "PE")}
+
+    def log_bars(self, bars, signals):
+        for name, label in [("atm_ce", "ATM CE"), ("atm_pe", "ATM PE")]:
+            bar = bars[name]
+            bar_logger.info(
+                "%s Close: %s - SMA: %s - RSI: %s - UpperBB: %s",
+                label,
+                bar["close"],
+                bar["SMA"],
+                bar["RSI"],
+                bar["UpperBB"],
+            )
+
+    def entry_conditions(self, bars, signals):
+        atm_ce, atm_pe = bars["atm_ce"], bars["atm_pe"]
+
+        overbought = (
+            (atm_ce["RSI"] > self.rsi_overbought)
+            & (atm_ce["open"] >= atm_ce["UpperBB"])
+            & (atm_ce["open"] + atm_pe["open"] > 50)
+        )
+
+        return [(None, ["atm_ce", "atm_pe"], overbought)]
+
+    # The RSI exit is checked before the hold time, which is inclusive here.
+    def exit_conditions(self, legs, hold_minutes, signals):
+        _, call_option = legs["CE"]
+
+        return [
+            ("RSI Oversold", call_option["RSI"] < self.rsi_oversold),
+            ("Hold Time Exceeded", hold_minutes >= self.hold_time),
+        ]
+
+
+# === SEMI DIRECTIONAL === #
+# Buys the OTM call and ATM put when the call trades above VWAP + ATR / 2.
+class SemiDirectionalStrategy(Strategy):
+    name = "semi_directional"
+
+    def __init__(
+        self,
+        atr_period=14,
+        atr_multiplier=0.5,
+        profit_target=0.15,
+        stop_loss=0.08,
+        hold_time=90,
+    ):
+        super().__init__(profit_target, stop_loss, hold_time)
+        self.atr_period = atr_period
+        self.atr_multiplier = atr_multiplier
+
+    def calculate_indicators(self, bars):
+        return {
+            "ATR": atr(bars["high"], bars["low"], bars["close"], self.atr_period),
+            "VWAP": vwap(bars["high"], bars["low"], bars["close"], bars["volume"]),
+        }
+
+    def indicator_params(self):
+        return {"ATR": {"period": self.atr_period}, "VWAP": {}}
+
+    def streaming_indicators(self):
+        return IndicatorSet(atr=ATR(self.atr_period), vwap=VWAP())
+
+    def select_legs(self, close):
+        atm = atm_strike(close)
+        otm = atm + 50
+        bar_logger.info("ATM: %s, OTM: %s", atm, otm)
+
+        return {"atm_ce": (atm, "CE"), "atm_pe": (atm, "PE"), "otm_ce": (otm, "CE")}
+
+    def session_legs(self, closes):
+        atm = atm_strikes(closes)
+        otm = atm + 50
+
+        return {"atm_ce": (atm, "CE"), "atm_pe": (atm, "PE"), "otm_ce": (otm, "CE")}
+
+    def signals(self, bars):
+        return {
+            "signal_value": bars["otm_ce"]["VWAP"]
+            + self.atr_multiplier * bars["atm_ce"]["ATR"]
+        }
+
+    def log_bars(self, bars, signals):
+        for name, label in [
+            ("atm_ce", "ATM CE"),
+            ("atm_pe", "ATM PE"),
+            ("otm_ce", "OTM CE"),
+        ]:
+            bar = bars[name]
+            bar_logger.info(
+                "%s Close: %s - Volume: %s - ATR: %s - VWAP: %s",
+                label,
+                bar["close"],
+                bar["volume"],
+                bar["ATR"],
+                bar["VWAP"],
+            )
+
+        bar_logger.info("Signal Value: %s", signals["signal_value"])
+
+    def entry_conditions(self, bars, signals):
+        otm_ce, atm_pe = bars["otm_ce"], bars["atm_pe"]
+
+        breakout = (otm_ce["open"] > signals["signal_value"]) & (
+            otm_ce["open"] + atm_pe["open"] > 50
+        )
+
+        return [(None, ["otm_ce", "atm_pe"], breakout)]
+
+    def exit_conditions(self, legs, hold_minutes, signals):
+        _, call_option = legs["CE"]
+        _, put_option = legs["PE"]
+
+        return [
+            ("Hold Time Exceeded", hold_minutes > self.hold_time),
+            (
+                "Signal Reversed",
+                call_option["open"] + put_option["open"] < signals["signal_value"],
+            ),
+        ]
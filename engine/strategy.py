@@ -0,0 +1,90 @@
+import logging
+
+
+logger = logging.getLogger()
+
+
+# === STRATEGY INTERFACE === #
+# The engine owns the day loop, orders, positions, the EOD / profit target /
+# stop loss exits and the results files; a strategy only decides which legs to
+# look at, when to enter and when else to exit. Leg names are chosen by the
+# strategy ("atm_ce", "otm_pe", ...) and map to (strike, option_type).
+#
+# signals(), entry_conditions() and exit_conditions() are written with
+# element-wise operators (&, |, comparisons) so the same expressions run on one
+# bar's scalars in the bar loop and on whole-session arrays in the vectorized
+# mode (see engine/vectorized.py).
+class Strategy:
+    name = None
+    entry_side = "BUY"
+    exit_side = "SELL"
+    short_premium = False  # PnL is entry - exit instead of exit - entry
+    record_entry_type = False  # add an "Entry Type" column to the positions
+    option_columns = ["timestamp", "open", "high", "low", "close", "volume"]
+    indicator_inputs = ["high", "low", "close", "volume"]
+
+    def __init__(self, profit_target, stop_loss, hold_time):
+        self.profit_target = profit_target
+        self.stop_loss = stop_loss
+        self.hold_time = hold_time
+
+    # Packed [contract, bar] arrays in, indicator columns in the same layout out.
+    def calculate_indicators(self, bars):
+        raise NotImplementedError
+
+    # Feature store key: indicator name -> parameters.
+    def indicator_params(self):
+        raise NotImplementedError
+
+    # Bar-by-bar equivalent of calculate_indicators() for replay and paper trading.
+    def streaming_indicators(self):
+        raise NotImplementedError
+
+    # {leg name: (strike, option_type)} for the current spot close. Every leg
+    # must have a bar for the minute to be considered.
+    def select_legs(self, close):
+        raise NotImplementedError
+
+    # select_legs() for an array of spot closes: {leg name: (strikes, option_type)}.
+    def session_legs(self, closes):
+        raise NotImplementedError
+
+    # Values derived from the current bars, passed to the entry and exit conditions.
+    def signals(self, bars):
+        return {}
+
+    # Bar loop logging of the current bars and signals, on engine.event_log's
+    # bar_logger; only called for sampled bars.
+    def log_bars(self, bars, signals):
+        pass
+
+    # [(entry_type, [leg names in order], condition)] in priority order. Only
+    # used when flat and before the entry cutoff.
+    def entry_conditions(self, bars, signals):
+        raise NotImplementedError
+
+    # [(exit_reason, condition)] in priority order, checked after EOD, profit
+    # target and stop loss. `legs` maps option type to (position, bar) for the
+    # open positions.
+    def exit_conditions(self, legs, hold_minutes, signals):
+        return []
+
+    def entry(self, bars, signals):
+        for entry_type, names, condition in self.entry_conditions(bars, signals):
+            if condition:
+                return entry_type, names
+
+        return None
+
+    def exit_reason(self, legs, hold_minutes, signals):
+        for exit_reason, condition in self.exit_conditions(legs, hold_minutes, signals):
+            if condition:
+                return exit_reason
+
+        return None
+
+    def leg_pnl(self, position, price):
+        if self.short_premium:
+            return position.entry_price - price
+
+        return price - position.entry_price
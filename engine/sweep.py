@@ -0,0 +1,318 @@
+import copy
+import itertools
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+
+from engine.market_data import MarketData
+from engine.runner import DayRunner, positions_frame
+from expiry_calendar import ExpiryCalendar
+from feature_store import feature_set_name
+from summary import (
+    add_expiry_columns,
+    calculate_stats_from_trades,
+    combine_leg_positions,
+)
+
+
+logger = logging.getLogger()
+
+SWEEP_CHUNK_SIZE = 16
+
+
+# === GRID === #
+# {"profit_target": [0.1, 0.15], "adx_period": [14, 21]} -> every combination,
+# in grid order.
+def grid_combinations(grid):
+    names = list(grid)
+
+    return [
+        dict(zip(names, values))
+        for values in itertools.product(*(grid[name] for name in names))
+    ]
+
+
+# Strategy attributes (periods, thresholds, exits) and BacktestConfig fields
+# (slippage_percent, lot_size, ...) can both be swept.
+def apply_params(strategy, config, params):
+    strategy = copy.copy(strategy)
+    config = copy.copy(config)
+
+    for name, value in params.items():
+        if hasattr(strategy, name):
+            setattr(strategy, name, value)
+        elif hasattr(config, name):
+            setattr(config, name, value)
+        else:
+            raise ValueError(f"Unknown sweep parameter: {name}")
+
+    return strategy, config
+
+
+# Combinations sharing an indicator set run in the same chunk, so their days
+# read one set of indicator batches.
+def sweep_chunks(strategy, config, combinations, indices, chunk_size=SWEEP_CHUNK_SIZE):
+    indices = sorted(
+        indices,
+        key=lambda index: feature_set_name(
+            apply_params(strategy, config, combinations[index])[0].indicator_params()
+        ),
+    )
+
+    return [
+        [(index, combinations[index]) for index in indices[start : start + chunk_size]]
+        for start in range(0, len(indices), chunk_size)
+    ]
+
+
+# === SIMULATE CHUNK === #
+# Days outer, combinations inner: each day's indicator batch is loaded once and
+# shared by every combination of the chunk. Returns (index, {trading_day:
+# combined trades or None}, error) per combination; a failing combination is
+# reported without affecting the others.
+def simulate_chunk(market_data, strategy, config, chunk, trading_days):
+    runs = []
+
+    for index, params in chunk:
+        run = {"index": index, "trades": {}, "error": None, "days": set()}
+
+        try:
+            run["runner"] = DayRunner(
+                *apply_params(strategy, config, params), market_data
+            )
+            # Days the combination's own config skips (event days) have no trades.
+            run["days"] = set(
+                run["runner"].trading_days(min(trading_days), max(trading_days))
+            )
+        except Exception as e:
+            run["error"] = f"{type(e).__name__}: {e}"
+
+        runs.append(run)
+
+    for trading_day in trading_days:
+        for run in runs:
+            if run["error"] is not None:
+                continue
+
+            run["trades"][trading_day] = None
+
+            if trading_day not in run["days"]:
+                continue
+
+            try:
+                ledger = run["runner"].trades(trading_day)
+
+                if ledger:
+                    run["trades"][trading_day] = combine_leg_positions(
+                        positions_frame(
+                            run["runner"].strategy, run["runner"].config, ledger
+                        )
+                    )
+            except Exception as e:
+                run["error"] = f"{type(e).__name__}: {e}"
+
+    return [(run["index"], run["trades"], run["error"]) for run in runs]
+
+
+# === WORKERS === #
+# One MarketData per worker process, shared by every chunk it runs.
+worker_market_data = None
+
+
+def init_sweep_worker(config):
+    global worker_market_data
+
+    worker_market_data = MarketData(config)
+
+
+def simulate_task(task):
+    return simulate_chunk(worker_market_data, *task)
+
+
+# === SIMULATOR === #
+# Per-day trades of grid combinations, simulated on demand and kept, so asking
+# again for days that were already run (overlapping walk-forward windows,
+# several metrics over one sweep) costs nothing. Use as a context manager; the
+# worker pool lives until exit. workers=1 runs in-process.
+class Simulator:
+    def __init__(
+        self,
+        strategy,
+        config,
+        combinations,
+        workers=None,
+        chunk_size=SWEEP_CHUNK_SIZE,
+    ):
+        self.strategy = strategy
+        self.config = config
+        self.combinations = combinations
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.executor = None
+        self.market_data = None
+        self.trades = {}  # (index, trading_day) -> combined trades or None
+        self.errors = {}  # index -> error
+        self.simulated = 0
+
+        # Unknown parameters fail here rather than in every worker.
+        for params in combinations:
+            apply_params(strategy, config, params)
+
+        self.expiry_calendar = ExpiryCalendar(MarketData(config).expiry_folders())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def run_chunks(self, chunks, trading_days):
+        tasks = [(self.strategy, self.config, chunk, trading_days) for chunk in chunks]
+
+        if self.workers == 1:
+            if self.market_data is None:
+                self.market_data = MarketData(self.config)
+
+            return [simulate_chunk(self.market_data, *task) for task in tasks]
+
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=init_sweep_worker,
+                initargs=(self.config,),
+            )
+
+        results = []
+        try:
+            for result in self.executor.map(simulate_task, tasks):
+                results.append(result)
+        except BrokenProcessPool:
+            logger.error("Sweep worker crashed")
+            self.executor = None
+
+        # Chunks lost with a crashed worker are reported, not rerun.
+        for chunk in chunks[len(results) :]:
+            results.append(
+                [(index, {}, "worker process crashed") for index, _ in chunk]
+            )
+
+        return results
+
+    # Simulates the (combination, day) pairs not run yet.
+    def run(self, indices, trading_days):
+        indices = [index for index in indices if index not in self.errors]
+        trading_days = sorted(trading_days)
+        missing = sorted(
+            {
+                trading_day
+                for index in indices
+                for trading_day in trading_days
+                if (index, trading_day) not in self.trades
+            }
+        )
+        pending = [
+            index
+            for index in indices
+            if any((index, trading_day) not in self.trades for trading_day in missing)
+        ]
+
+        if not pending:
+            return
+
+        chunks = sweep_chunks(
+            self.strategy, self.config, self.combinations, pending, self.chunk_size
+        )
+
+        for result in self.run_chunks(chunks, missing):
+            for index, day_trades, error in result:
+                if error is not None:
+                    self.errors[index] = error
+
+                for trading_day, trades in day_trades.items():
+                    self.trades[(index, trading_day)] = trades
+
+        self.simulated += len(pending) * len(missing)
+
+    # A combination's combined trades over the days (see trade_log()).
+    def trade_log(self, index, trading_days):
+        self.run([index], trading_days)
+
+        return trade_log(
+            [
+                self.trades.get((index, trading_day))
+                for trading_day in sorted(trading_days)
+            ],
+            self.expiry_calendar,
+        )
+
+    def stats(self, index, trading_days):
+        return trade_stats(self.trade_log(index, trading_days))
+
+
+# === TRADE LOG === #
+# Per-day combined trades (None for days without trades) in one frame in the
+# summary notebook's format (see summary.combine_leg_positions /
+# add_expiry_columns), or None when there are no trades at all.
+def trade_log(frames, expiry_calendar):
+    frames = [frame for frame in frames if frame is not None]
+
+    if not frames:
+        return None
+
+    trades = pd.concat(frames, ignore_index=True).sort_values(by="Entry Timestamp")
+
+    return add_expiry_columns(trades.reset_index(drop=True), expiry_calendar)
+
+
+def trade_stats(trades):
+    if trades is None:
+        return {"Total Trades": 0}
+
+    stats = calculate_stats_from_trades(trades) or {}
+    stats.pop("timestamp", None)
+
+    return stats
+
+
+# === SWEEP === #
+# One row per combination, in grid order: the parameters, the
+# calculate_stats_from_trades() metrics of its combined trades and an "Error"
+# column.
+def run_sweep(
+    strategy,
+    config,
+    grid,
+    start_date,
+    end_date,
+    workers=None,
+    chunk_size=SWEEP_CHUNK_SIZE,
+):
+    combinations = grid_combinations(grid)
+
+    with Simulator(strategy, config, combinations, workers, chunk_size) as simulator:
+        trading_days = DayRunner(strategy, config).trading_days(start_date, end_date)
+
+        logger.info(
+            f"Sweep: {len(combinations)} combinations - {len(trading_days)} days"
+        )
+
+        simulator.run(range(len(combinations)), trading_days)
+
+        rows = []
+        for index, params in enumerate(combinations):
+            row = {"Combination": index, **params}
+
+            if index not in simulator.errors:
+                try:
+                    row.update(simulator.stats(index, trading_days))
+                except Exception as e:
+                    simulator.errors[index] = f"{type(e).__name__}: {e}"
+
+            row["Error"] = simulator.errors.get(index)
+            rows.append(row)
+
+    return pd.DataFrame(rows)
@@ -0,0 +1,293 @@
+import logging
+
+import numpy as np
+
+from engine.orders import Ledger, close_position, enter_trade
+from market_time import (
+    MINUTES_PER_DAY,
+    SESSION_START_MINUTE,
+    SESSION_MINUTES,
+    day_minute,
+)
+
+
+logger = logging.getLogger()
+
+
+# === SESSION ARRAYS === #
+# Every contract the day touches, as one array per column aligned to the spot
+# minutes of the session (NaN and present=False where the contract has no bar).
+class SessionBars:
+    def __init__(self, options, expiry_folder, trading_day, minutes):
+        self.options = options
+        self.expiry_folder = expiry_folder
+        self.trading_day = trading_day
+        self.minutes = minutes
+        self.contracts = {}
+
+    def contract(self, strike, option_type):
+        key = (int(strike), option_type)
+
+        if key not in self.contracts:
+            self.contracts[key] = self.load_contract(*key)
+
+        return self.contracts[key]
+
+    def load_contract(self, strike, option_type):
+        arrays = self.options.option_day_arrays(
+            self.expiry_folder, strike, option_type, self.trading_day
+        )
+
+        if arrays is None:
+            return {}, np.zeros(len(self.minutes), dtype=bool)
+
+        # Last bar of a duplicated minute wins, as in the per-day bar dicts.
+        bar_minutes = arrays["epoch_minute"]
+        order = np.argsort(bar_minutes, kind="stable")
+        rows = np.searchsorted(bar_minutes[order], self.minutes, "right") - 1
+        present = (rows >= 0) & (bar_minutes[order][rows.clip(0)] == self.minutes)
+        rows = order[rows.clip(0)]
+
+        columns = {}
+        for column, values in arrays.items():
+            values = np.asarray(values, dtype=np.float64)[rows]
+            values[~present] = np.nan
+            columns[column] = values
+
+        return columns, present
+
+    # A leg whose strike moves with the spot: each minute takes its own
+    # contract's bar.
+    def leg(self, strikes, option_type):
+        present = np.zeros(len(self.minutes), dtype=bool)
+        columns = {}
+
+        for strike in np.unique(strikes):
+            selected = strikes == strike
+            contract_columns, contract_present = self.contract(strike, option_type)
+
+            for column, values in contract_columns.items():
+                columns.setdefault(column, np.full(len(self.minutes), np.nan))
+                columns[column][selected] = values[selected]
+
+            present[selected] = contract_present[selected]
+
+        return columns, present
+
+    def available(self, availability, strikes, option_type):
+        session_minutes = self.minutes % MINUTES_PER_DAY - SESSION_START_MINUTE
+        in_session = (session_minutes >= 0) & (session_minutes < SESSION_MINUTES)
+        session_minutes = session_minutes.clip(0, SESSION_MINUTES - 1)
+
+        available = np.zeros(len(self.minutes), dtype=bool)
+
+        for strike in np.unique(strikes):
+            selected = strikes == strike
+            bits = availability.minutes(
+                self.expiry_folder, strike, option_type, self.trading_day
+            )
+            available[selected] = bits[session_minutes[selected]]
+
+        # Minutes outside the session are not in the bitmaps; the bars decide.
+        return available | ~in_session
+
+
+def first_index(mask, start):
+    if start >= len(mask) or not mask[start:].any():
+        return None
+
+    return start + int(np.argmax(mask[start:]))
+
+
+# === TRADING SESSION === #
+# One day's session arrays for a strategy: the legs it looks at each minute and
+# their bars, the minutes the bar loop gets past the data checks (`valid`), the
+# EOD minutes and the signals.
+class TradingSession:
+    def __init__(
+        self,
+        strategy,
+        config,
+        options,
+        availability,
+        trading_day,
+        spot_day,
+        expiry_folder,
+    ):
+        start, stop = spot_day.session_start, spot_day.session_end
+        self.timestamps = spot_day.timestamps[start:stop]
+        self.minutes = spot_day.epoch_minutes[start:stop]
+        self.contracts = SessionBars(options, expiry_folder, trading_day, self.minutes)
+        self.legs = strategy.session_legs(spot_day.closes[start:stop])
+
+        self.bars = {}
+        self.valid = np.ones(len(self.minutes), dtype=bool)
+
+        for name, (strikes, option_type) in self.legs.items():
+            self.bars[name], present = self.contracts.leg(strikes, option_type)
+            self.valid &= present
+
+            if availability is not None:
+                self.valid &= self.contracts.available(
+                    availability, strikes, option_type
+                )
+
+        self.eod = self.valid & (
+            self.minutes % MINUTES_PER_DAY > day_minute(config.end_time)
+        )
+        self.signals = strategy.signals(self.bars) if self.valid.any() else {}
+
+
+# === EXIT RESOLVER === #
+# Finds the first minute from `start` on where the open position exits, from
+# the forward paths of the held legs: the EOD, profit target, stop loss and
+# strategy exit conditions are compared over the rest of the session at once
+# and argmax picks the first hit. Only minutes the bar loop would have reached
+# count (`valid`), and the non-EOD exits need a bar on every held leg. After a
+# partial EOD exit only EOD is left. `trade` is the ledger rows of the trade.
+# Returns (index, timestamp, exit_reason, {option_type: (row, exit bar open)})
+# for the legs that can be closed, or None when the position is still open at
+# the end of the session.
+def resolve_exit(strategy, session, ledger, trade, start):
+    legs = {}
+    held = np.ones(len(session.minutes), dtype=bool)
+
+    for option_type in ["CE", "PE"]:
+        row = ledger.open_position(option_type)
+
+        if row is None:
+            continue
+
+        position = ledger.position(row)
+        columns, present = session.contracts.contract(position.strike, option_type)
+        legs[option_type] = (row, position, columns, present)
+        held &= present
+
+    exits = [("EOD", session.eod)]
+
+    if all(ledger.is_open(row) for row in trade):
+        pnl = 0
+        entry_total = 0
+
+        for _, position, columns, _ in legs.values():
+            pnl = pnl + strategy.leg_pnl(position, columns["open"])
+            entry_total = entry_total + position.entry_price
+
+        pnl = pnl / entry_total
+        hold_minutes = (
+            session.timestamps - ledger.position(trade[0]).entry_timestamp
+        ).total_seconds().to_numpy() / 60
+
+        checked = session.valid & held
+        conditions = [
+            ("Profit Target Hit", pnl >= strategy.profit_target),
+            ("Stop Loss Hit", pnl <= -strategy.stop_loss),
+        ] + strategy.exit_conditions(
+            {
+                option_type: (position, columns)
+                for option_type, (_, position, columns, _) in legs.items()
+            },
+            hold_minutes,
+            session.signals,
+        )
+
+        exits += [
+            (exit_reason, checked & condition) for exit_reason, condition in conditions
+        ]
+
+    index = first_index(np.logical_or.reduce([mask for _, mask in exits]), start)
+
+    if index is None:
+        return None
+
+    exit_reason = next(exit_reason for exit_reason, mask in exits if mask[index])
+    prices = {
+        option_type: (row, float(columns["open"][index]))
+        for option_type, (row, _, columns, present) in legs.items()
+        if present[index]
+    }
+
+    return index, session.timestamps[index], exit_reason, prices
+
+
+# Resolves and books the exits of a trade entered before `start`. Returns the
+# index after the last leg's exit, or None when the trade stays open.
+def exit_trade(strategy, config, session, ledger, trade, start):
+    while any(ledger.is_open(row) for row in trade):
+        resolved = resolve_exit(strategy, session, ledger, trade, start)
+
+        if resolved is None:
+            return None
+
+        index, timestamp, exit_reason, prices = resolved
+        logger.info(
+            f"Exit: {timestamp} - {exit_reason}", extra={"market_time": timestamp}
+        )
+
+        for row, price in prices.values():
+            close_position(strategy, config, ledger, row, price, timestamp, exit_reason)
+
+        start = index + 1
+
+    return start
+
+
+# === VECTORIZED TRADING DAY === #
+# Same trades as engine.runner.backtest_day: entry conditions and signals are
+# evaluated for the whole session at once, then a scan jumps from entry to
+# exit to the next entry instead of visiting every minute.
+def vectorized_day(
+    strategy,
+    config,
+    options,
+    availability,
+    trading_day,
+    spot_day,
+    expiry_folder,
+    entry_cutoff_minute,
+):
+    session = TradingSession(
+        strategy, config, options, availability, trading_day, spot_day, expiry_folder
+    )
+
+    ledger = Ledger()
+
+    if not session.valid.any():
+        return ledger
+
+    can_enter = session.valid & (session.minutes < entry_cutoff_minute)
+    entries = [
+        (entry_type, names, can_enter & condition)
+        for entry_type, names, condition in strategy.entry_conditions(
+            session.bars, session.signals
+        )
+    ]
+    any_entry = np.logical_or.reduce([mask for _, _, mask in entries])
+
+    index = 0
+    while index is not None:
+        index = first_index(any_entry, index)
+
+        if index is None:
+            break
+
+        entry_type, names = next(
+            (entry_type, names) for entry_type, names, mask in entries if mask[index]
+        )
+        trade = enter_trade(
+            strategy,
+            config,
+            session.timestamps[index],
+            [
+                (int(session.legs[name][0][index]), session.legs[name][1])
+                for name in names
+            ],
+            [{"open": float(session.bars[name]["open"][index])} for name in names],
+            entry_type,
+            ledger,
+        )
+
+        # Entries resume after every leg of the trade is closed.
+        index = exit_trade(strategy, config, session, ledger, trade, index + 1)
+
+    return ledger
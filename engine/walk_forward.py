@@ -0,0 +1,153 @@
+import logging
+import math
+
+import pandas as pd
+
+from engine.runner import DayRunner
+from engine.sweep import SWEEP_CHUNK_SIZE, Simulator, grid_combinations
+
+
+logger = logging.getLogger()
+
+# calculate_stats_from_trades() metrics where the smaller value is the better one.
+LOWER_IS_BETTER = {
+    "Max Drawdown",
+    "Total Cost",
+    "Max Capital Required",
+    "Losing Trades",
+    "Consecutive Losses",
+}
+
+
+# === WINDOWS === #
+# [(train days, test days)] over the trading days. Test windows follow each
+# other without overlap; a rolling train window is the train_days days before
+# its test window, an anchored one every day from the start.
+def walk_forward_windows(trading_days, train_days, test_days, anchored=False):
+    windows = []
+
+    for test_start in range(train_days, len(trading_days), test_days):
+        train_start = 0 if anchored else test_start - train_days
+        windows.append(
+            (
+                trading_days[train_start:test_start],
+                trading_days[test_start : test_start + test_days],
+            )
+        )
+
+    return windows
+
+
+def metric_value(stats, metric):
+    value = stats.get(metric)
+
+    if value is None or isinstance(value, str) or math.isnan(value):
+        return None
+
+    return value
+
+
+# The combination with the best metric over the days; ties go to the earlier
+# combination in grid order. Combinations without trades or with a failed run
+# are never picked. Returns (index, value) or (None, None).
+def best_combination(simulator, trading_days, metric):
+    best_index, best_value = None, None
+
+    simulator.run(range(len(simulator.combinations)), trading_days)
+
+    for index in range(len(simulator.combinations)):
+        if index in simulator.errors:
+            continue
+
+        value = metric_value(simulator.stats(index, trading_days), metric)
+
+        if value is None:
+            continue
+
+        if (
+            best_value is None
+            or (metric in LOWER_IS_BETTER and value < best_value)
+            or (metric not in LOWER_IS_BETTER and value > best_value)
+        ):
+            best_index, best_value = index, value
+
+    return best_index, best_value
+
+
+# === WALK FORWARD === #
+# Optimises the grid on each train window and trades the winner on the
+# following test window. Per-day trades of every (combination, day) are
+# simulated once and reused by every window they fall in (see
+# engine.sweep.Simulator), so a rolling window only simulates its new days.
+#
+# Returns (trades, windows): the stitched out-of-sample trades in the combined
+# positions format app.py reads, with a "Window" column, and one row per window
+# with its dates, chosen parameters and train / test metric.
+def run_walk_forward(
+    strategy,
+    config,
+    grid,
+    start_date,
+    end_date,
+    train_days,
+    test_days,
+    metric="Net PnL",
+    anchored=False,
+    workers=None,
+    chunk_size=SWEEP_CHUNK_SIZE,
+):
+    combinations = grid_combinations(grid)
+    trading_days = DayRunner(strategy, config).trading_days(start_date, end_date)
+    windows = walk_forward_windows(trading_days, train_days, test_days, anchored)
+
+    logger.info(
+        f"Walk forward: {len(combinations)} combinations - {len(trading_days)} days - {len(windows)} windows"
+    )
+
+    trades = []
+    rows = []
+
+    with Simulator(strategy, config, combinations, workers, chunk_size) as simulator:
+        for window, (train, test) in enumerate(windows):
+            index, train_value = best_combination(simulator, train, metric)
+
+            row = {
+                "Window": window,
+                "Train Start": train[0],
+                "Train End": train[-1],
+                "Test Start": test[0],
+                "Test End": test[-1],
+                "Combination": index,
+                **(combinations[index] if index is not None else {}),
+                f"Train {metric}": train_value,
+                f"Test {metric}": None,
+                "Test Trades": 0,
+            }
+
+            if index is None:
+                logger.warning(
+                    f"Window {window}: no combination traded {train[0]} - {train[-1]}"
+                )
+            else:
+                test_trades = simulator.trade_log(index, test)
+
+                if test_trades is not None:
+                    row[f"Test {metric}"] = metric_value(
+                        simulator.stats(index, test), metric
+                    )
+                    row["Test Trades"] = len(test_trades)
+                    trades.append(test_trades.assign(Window=window))
+
+            rows.append(row)
+
+        logger.info(
+            f"Walk forward: simulated {simulator.simulated} combination days, {len(simulator.errors)} combinations failed"
+        )
+
+    trades = (
+        pd.concat(trades, ignore_index=True)
+        if trades
+        else pd.DataFrame(columns=["Window"])
+    )
+
+    return trades, pd.DataFrame(rows)
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+
+DAY = np.timedelta64(1, "D")
+
+
+def to_datetime64(timestamps):
+    return pd.DatetimeIndex(np.atleast_1d(timestamps)).values.astype("datetime64[ns]")
+
+
+# === EXPIRY CALENDAR === #
+# Sorted expiry dates built once from the expiry folder names ("28NOV24").
+# Lookups bisect the sorted dates; the *_many variants take whole arrays.
+class ExpiryCalendar:
+    def __init__(self, expiry_folders):
+        expiry_dates = (
+            pd.DatetimeIndex(
+                pd.to_datetime(pd.Series(list(expiry_folders)), format="%d%b%y")
+            )
+            .unique()
+            .sort_values()
+        )
+
+        self.dates = expiry_dates.values.astype("datetime64[ns]")
+        self.folders = np.asarray(
+            expiry_dates.strftime("%d%b%y").str.upper(), dtype=object
+        )
+
+    def __len__(self):
+        return len(self.dates)
+
+    def positions(self, timestamps):
+        return np.searchsorted(self.dates, to_datetime64(timestamps), side="left")
+
+    def nearest(self, timestamp):
+        position = self.positions(timestamp)[0]
+
+        if position == len(self.dates):
+            return None
+
+        return self.folders[position]
+
+    def nearest_many(self, timestamps):
+        positions = self.positions(timestamps)
+        folders = np.full(len(positions), None, dtype=object)
+
+        found = positions < len(self.dates)
+        folders[found] = self.folders[positions[found]]
+
+        return folders
+
+    # Same as (nearest expiry of the calendar day - timestamp).days + 1, so a
+    # trade taken during expiry day has 0 days to expiry.
+    def days_to_expiry_many(self, timestamps):
+        timestamps = to_datetime64(timestamps)
+        positions = self.positions(timestamps.astype("datetime64[D]"))
+
+        if (positions == len(self.dates)).any():
+            raise ValueError(
+                f"No expiry on or after {timestamps[positions == len(self.dates)][0]}"
+            )
+
+        return np.floor_divide(self.dates[positions] - timestamps, DAY) + 1
+
+    def days_to_expiry(self, timestamp):
+        return int(self.days_to_expiry_many(timestamp)[0])
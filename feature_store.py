@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from indicators import INDICATOR_VERSION
+
+
+FEATURE_STORE = "database/features/"
+FEATURE_METADATA_KEY = b"features"
+
+
+# === KEYS === #
+# {"EMA": {"span": 30}, "VWAP": {}} -> "EMA_span=30+VWAP", so every parameter
+# set gets its own folder and changing a period never reads old features.
+def feature_set_name(params):
+    return "+".join(
+        name + "".join(f"_{param}={value}" for param, value in sorted(values.items()))
+        for name, values in sorted(params.items())
+    )
+
+
+# Source files are identified by path, size and modification time, which is
+# enough to notice a re-ingested or rebuilt day without reading any bars.
+def data_version(paths):
+    digest = hashlib.sha1()
+
+    for path in sorted(paths):
+        stat = os.stat(path)
+        digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+
+    return digest.hexdigest()
+
+
+def member_names(members):
+    return [[str(part) for part in member] for member in members]
+
+
+# === FEATURE STORE === #
+# One parquet file per indicator batch (see indicators.BatchIndicators) holding
+# the packed [member, bar] indicator arrays flattened row by row. The data
+# version, indicator code version and member order are kept in the schema
+# metadata; a file that no longer matches is treated as stale and recomputed.
+# `params` and `source_paths` are called on every lookup, so module constants
+# changed between runs are picked up.
+class FeatureStore:
+    def __init__(self, params, source_paths, root=FEATURE_STORE):
+        self.params = params
+        self.source_paths = source_paths
+        self.root = root
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def path(self, key):
+        return os.path.join(
+            self.root,
+            feature_set_name(self.params()),
+            "_".join(str(part) for part in key) + ".parquet",
+        )
+
+    def load(self, key, members):
+        path = self.path(key)
+
+        if not os.path.exists(path):
+            self.misses += 1
+            return None
+
+        parquet_file = pq.ParquetFile(path)
+        metadata = json.loads(parquet_file.schema_arrow.metadata[FEATURE_METADATA_KEY])
+
+        version = data_version(self.source_paths(*key))
+
+        if (
+            metadata["version"] != version
+            or metadata.get("indicators") != INDICATOR_VERSION
+            or metadata["members"] != member_names(members)
+        ):
+            self.stale += 1
+            return None
+
+        self.hits += 1
+        table = parquet_file.read()
+
+        return {
+            name: table[name].to_numpy().reshape(-1, metadata["width"])
+            for name in table.column_names
+        }
+
+    def save(self, key, members, indicators):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        width = next(iter(indicators.values())).shape[1]
+        metadata = {
+            "version": data_version(self.source_paths(*key)),
+            "indicators": INDICATOR_VERSION,
+            "members": member_names(members),
+            "width": width,
+        }
+
+        table = pa.table(
+            {name: values.reshape(-1) for name, values in indicators.items()}
+        ).replace_schema_metadata({FEATURE_METADATA_KEY: json.dumps(metadata)})
+
+        # Written aside and renamed so a reader never sees a partial file.
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        pq.write_table(table, temp_path)
+        os.replace(temp_path, path)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "stale": self.stale}
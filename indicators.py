@@ -0,0 +1,225 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from rolling import RollingWindow, rolling_mean, rolling_sum
+
+
+# Stored features record this; bump it when indicator arithmetic changes.
+INDICATOR_VERSION = 3
+
+
+# === PACK CHAIN === #
+# Every kernel below works on 2-D float64 arrays shaped [contract, bar]. Each
+# contract's bars are left-aligned and the tail is NaN padded, so column i is the
+# i-th bar of every contract, exactly like row i of a single-contract frame.
+def pack_frames(frames, columns):
+    lengths = np.array([len(df) for df in frames], dtype=np.int64)
+    width = int(lengths.max()) if len(frames) else 0
+
+    rows = np.repeat(np.arange(len(frames)), lengths)
+    offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    bars = np.arange(len(rows)) - offsets
+
+    packed = {}
+    for column in columns:
+        packed[column] = np.full((len(frames), width), np.nan)
+
+        if len(rows):
+            packed[column][rows, bars] = np.concatenate(
+                [df[column].to_numpy(dtype=np.float64) for df in frames]
+            )
+
+    return packed, lengths
+
+
+def shift(values, periods=1):
+    shifted = np.full(values.shape, np.nan)
+    shifted[:, periods:] = values[:, :-periods]
+
+    return shifted
+
+
+# === INDICATORS === #
+# Same recursion as pandas' ewm(span=span, adjust=False).mean().
+def ema(close, span):
+    alpha = 1.0 / (1.0 + (span - 1) / 2.0)
+    old_wt_factor = 1.0 - alpha
+
+    weighted = close[:, 0].copy()
+    old_wt = np.ones(len(close))
+
+    output = np.full(close.shape, np.nan)
+    output[:, 0] = weighted
+
+    for i in range(1, close.shape[1]):
+        cur = close[:, i]
+        obs = ~np.isnan(cur)
+        live = ~np.isnan(weighted)
+
+        old_wt = np.where(live, old_wt * old_wt_factor, old_wt)
+        blended = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+        weighted = np.where(live & obs & (weighted != cur), blended, weighted)
+        old_wt = np.where(live & obs, 1.0, old_wt)
+        weighted = np.where(~live & obs, cur, weighted)
+
+        output[:, i] = weighted
+
+    return output
+
+
+# The strategy's own ADX: directional movement summed over the window and
+# scaled by the summed close, not Wilder's smoothed true range.
+def adx(high, low, close, period):
+    up_move = high - shift(high)
+    down_move = shift(low) - low
+
+    plus_dm = np.where(up_move > down_move, up_move, 0.0)
+    minus_dm = np.where(down_move > up_move, down_move, 0.0)
+
+    close_sum = rolling_sum(close, period)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        plus_di = (rolling_sum(plus_dm, period) / close_sum) * 100
+        minus_di = (rolling_sum(minus_dm, period) / close_sum) * 100
+        dx = abs(plus_di - minus_di) / abs(plus_di + minus_di) * 100
+
+    return {
+        "+DM": plus_dm,
+        "-DM": minus_dm,
+        "+DI": plus_di,
+        "-DI": minus_di,
+        "ADX": rolling_mean(dx, period),
+    }
+
+
+# Like the pandas cumsum in calculate_vwap, the sums skip missing values and
+# stay NaN where their own input is.
+def vwap(high, low, close, volume):
+    price_volume = (high + low + close) / 3 * volume
+    cumulative_price_volume = np.nancumsum(price_volume, axis=1)
+    cumulative_price_volume[np.isnan(price_volume)] = np.nan
+    cumulative_volume = np.nancumsum(volume, axis=1)
+    cumulative_volume[np.isnan(volume)] = np.nan
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return cumulative_price_volume / cumulative_volume
+
+
+def bollinger_bands(close, period):
+    window = RollingWindow(close, period)
+    sma = window.mean()
+    std = window.std()
+
+    return {
+        "SMA": sma,
+        "StdDev": std,
+        "UpperBB": sma + (2 * std),
+        "LowerBB": sma - (2 * std),
+    }
+
+
+def rsi(close, period):
+    delta = close - shift(close)
+
+    gain = rolling_mean(np.where(delta > 0, delta, 0.0), period)
+    loss = rolling_mean(-np.where(delta < 0, delta, 0.0), period)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return 100 - (100 / (1 + gain / loss))
+
+
+def atr(high, low, close, period):
+    previous_close = shift(close)
+    true_range = np.fmax(
+        np.fmax(high - low, abs(high - previous_close)), abs(low - previous_close)
+    )
+
+    return rolling_mean(true_range, None, min_periods=period)
+
+
+# === BATCHED INDICATORS === #
+# `compute` takes the packed bars ({column: [contract, bar]}) and returns the
+# indicator columns in the same layout.
+def with_indicators(df, indicators, row):
+    df = df.copy()
+
+    for name, values in indicators.items():
+        df[name] = values[row, : len(df)]
+
+    return df
+
+
+# Indicators for a batch of frames computed in one pass, kept for the `maxsize`
+# most recent batches. The loader maps a batch key to {member: DataFrame}, e.g.
+# an (expiry, trading day) chain keyed by (strike, option_type), or a contract's
+# file keyed by trading day. With a feature store, stored indicators are read
+# back instead of being recomputed.
+class BatchIndicators:
+    def __init__(self, loader, compute, columns, maxsize=1, store=None):
+        self.loader = loader
+        self.compute = compute
+        self.columns = columns
+        self.maxsize = maxsize
+        self.store = store
+        self.batches = OrderedDict()
+
+    def load(self, key):
+        if key in self.batches:
+            self.batches.move_to_end(key)
+            return self.batches[key]
+
+        frames = self.loader(*key)
+        rows = {member: row for row, member in enumerate(frames)}
+
+        indicators = {}
+        if frames:
+            indicators = self.compute_batch(key, frames)
+
+        self.batches[key] = (frames, rows, indicators)
+
+        while len(self.batches) > self.maxsize:
+            self.batches.popitem(last=False)
+
+        return self.batches[key]
+
+    def compute_batch(self, key, frames):
+        members = list(frames)
+
+        if self.store is not None:
+            indicators = self.store.load(key, members)
+
+            if indicators is not None:
+                return indicators
+
+        packed, _ = pack_frames(list(frames.values()), self.columns)
+        indicators = self.compute(packed)
+
+        if self.store is not None:
+            self.store.save(key, members, indicators)
+
+        return indicators
+
+    def get(self, key, member):
+        frames, rows, indicators = self.load(key)
+
+        if member not in rows:
+            return None
+
+        return with_indicators(frames[member], indicators, rows[member])
+
+    # get() as {column: array} for the given frame columns plus the indicator
+    # columns, without building a DataFrame.
+    def arrays(self, key, member, columns):
+        frames, rows, indicators = self.load(key)
+
+        if member not in rows:
+            return None
+
+        df = frames[member]
+        arrays = {column: df[column].to_numpy() for column in columns}
+
+        for name, values in indicators.items():
+            arrays[name] = values[rows[member], : len(df)]
+
+        return arrays
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+
+# === SESSION CALENDAR === #
+SESSION_START = "09:15:00"
+SESSION_END = "15:29:00"
+SESSION_MINUTES = 375
+
+SESSION_START_OFFSET = pd.Timedelta(SESSION_START)
+SESSION_START_MINUTE = int(SESSION_START_OFFSET.total_seconds() // 60)
+
+MINUTES_PER_DAY = 1440
+MINUTE_NS = 60_000_000_000
+
+
+def session_timestamps(trading_day):
+    return (
+        pd.Timestamp(trading_day)
+        + SESSION_START_OFFSET
+        + pd.to_timedelta(np.arange(SESSION_MINUTES), unit="min")
+    )
+
+
+def session_minute(timestamp):
+    return timestamp.hour * 60 + timestamp.minute - SESSION_START_MINUTE
+
+
+def day_minute(clock):
+    return int(pd.Timedelta(clock).total_seconds() // 60)
+
+
+# === INTEGER TIME CODES === #
+# Written next to "timestamp" at ingest time so loaders filter and join on
+# integers: minutes since the epoch (naive exchange time) and the minute of
+# the session. Bars outside the session get NO_SESSION_MINUTE.
+TIME_CODE_COLUMNS = ["epoch_minute", "minute_of_session"]
+NO_SESSION_MINUTE = np.iinfo(np.uint16).max
+
+
+def epoch_minutes(timestamps):
+    return pd.DatetimeIndex(timestamps).as_unit("ns").asi8 // MINUTE_NS
+
+
+def epoch_minute(timestamp):
+    return pd.Timestamp(timestamp).value // MINUTE_NS
+
+
+def epoch_day(trading_day):
+    return epoch_minute(pd.Timestamp(trading_day)) // MINUTES_PER_DAY
+
+
+def add_time_codes(df):
+    epoch = epoch_minutes(df["timestamp"])
+    minutes = epoch % MINUTES_PER_DAY - SESSION_START_MINUTE
+
+    df["epoch_minute"] = epoch
+    df["minute_of_session"] = np.where(
+        (minutes >= 0) & (minutes < SESSION_MINUTES), minutes, NO_SESSION_MINUTE
+    ).astype(np.uint16)
+
+    return df
+
+
+def with_time_codes(df):
+    if "epoch_minute" not in df or "minute_of_session" not in df:
+        df = add_time_codes(df)
+
+    return df
+
+
+# Files written before the time codes existed get them computed on read.
+def read_bars(path, columns):
+    parquet_file = pq.ParquetFile(path)
+    names = parquet_file.schema_arrow.names
+
+    df = parquet_file.read(
+        columns=[column for column in columns + TIME_CODE_COLUMNS if column in names]
+    ).to_pandas()
+
+    return with_time_codes(df)
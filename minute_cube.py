@@ -0,0 +1,209 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+
+from market_time import (
+    MINUTES_PER_DAY,
+    SESSION_MINUTES,
+    SESSION_START_MINUTE,
+    TIME_CODE_COLUMNS,
+    epoch_day,
+    session_minute,
+    session_timestamps,
+    with_time_codes,
+)
+from option_chain_dataset import OPTIONS_DATASET, list_expiries, open_chain_dataset
+
+
+OPTIONS_CUBE = "database/options_cube/"
+CUBE_FIELDS = ["open", "high", "low", "close", "volume"]
+OPTION_TYPES = ["CE", "PE"]
+
+
+# === BUILD CUBE === #
+# One file per expiry, laid out as [day, strike, type, minute-of-session, field]
+# in float64 so prices round-trip exactly. Missing bars are NaN. index.json maps
+# each expiry to its trading days and strikes, i.e. to the first two axes, and
+# lists the days with bars outside the session ("outside_session"): the cube has
+# no slot for them, so those days are read from the dataset instead (see
+# MinuteCube.covers). Returns {expiry: bars outside the session}.
+def build_cube(dataset_root=OPTIONS_DATASET, cube_root=OPTIONS_CUBE):
+    os.makedirs(cube_root, exist_ok=True)
+
+    dataset = open_chain_dataset(dataset_root)
+    index = {}
+    outside_bars = {}
+
+    for expiry in sorted(list_expiries(dataset_root)):
+        columns = ["trade_date", "strike", "option_type", "timestamp"] + CUBE_FIELDS
+        columns += [
+            column for column in TIME_CODE_COLUMNS if column in dataset.schema.names
+        ]
+
+        df = with_time_codes(
+            dataset.to_table(
+                columns=columns, filter=ds.field("expiry") == expiry
+            ).to_pandas()
+        )
+
+        if df.empty:
+            continue
+
+        days = sorted(df["trade_date"].unique())
+        strikes = sorted(int(strike) for strike in df["strike"].unique())
+
+        minutes = df["minute_of_session"].to_numpy().astype(np.int64)
+        in_session = minutes < SESSION_MINUTES
+        outside_days = sorted(df.loc[~in_session, "trade_date"].unique())
+
+        if not in_session.all():
+            outside_bars[expiry] = int((~in_session).sum())
+
+        df = df[in_session]
+        minutes = minutes[in_session]
+
+        cube = np.lib.format.open_memmap(
+            os.path.join(cube_root, f"{expiry}.npy"),
+            mode="w+",
+            dtype=np.float64,
+            shape=(
+                len(days),
+                len(strikes),
+                len(OPTION_TYPES),
+                SESSION_MINUTES,
+                len(CUBE_FIELDS),
+            ),
+        )
+        cube[:] = np.nan
+        cube[
+            np.searchsorted(days, df["trade_date"].to_numpy()),
+            np.searchsorted(strikes, df["strike"].to_numpy()),
+            (df["option_type"] == "PE").to_numpy().astype(np.int64),
+            minutes,
+        ] = df[CUBE_FIELDS].to_numpy(dtype=np.float64)
+        cube.flush()
+        del cube
+
+        index[expiry] = {
+            "days": days,
+            "strikes": strikes,
+            "outside_session": outside_days,
+        }
+
+    with open(os.path.join(cube_root, "index.json"), "w") as f:
+        json.dump(index, f)
+
+    return outside_bars
+
+
+# === READ CUBE === #
+class MinuteCube:
+    def __init__(self, cube_root=OPTIONS_CUBE):
+        self.cube_root = cube_root
+        self.index = None
+        self.cubes = {}
+        self.offsets = {}
+
+    def load_index(self):
+        if self.index is None:
+            with open(os.path.join(self.cube_root, "index.json")) as f:
+                self.index = json.load(f)
+
+            for expiry, entry in self.index.items():
+                self.offsets[expiry] = (
+                    {day: i for i, day in enumerate(entry["days"])},
+                    {strike: i for i, strike in enumerate(entry["strikes"])},
+                )
+
+        return self.index
+
+    def expiries(self):
+        return list(self.load_index())
+
+    # False for a day with bars outside the session, which the cube lacks.
+    def covers(self, expiry, trading_day):
+        entry = self.load_index().get(expiry, {})
+
+        return str(trading_day) not in entry.get("outside_session", [])
+
+    def cube(self, expiry):
+        if expiry not in self.cubes:
+            self.cubes[expiry] = np.load(
+                os.path.join(self.cube_root, f"{expiry}.npy"), mmap_mode="r"
+            )
+
+        return self.cubes[expiry]
+
+    def locate(self, expiry, strike, option_type, trading_day):
+        self.load_index()
+
+        if expiry not in self.offsets:
+            return None
+
+        day_offsets, strike_offsets = self.offsets[expiry]
+        day = day_offsets.get(str(trading_day))
+        strike = strike_offsets.get(int(strike))
+
+        if day is None or strike is None:
+            return None
+
+        return day, strike, OPTION_TYPES.index(option_type)
+
+    def bar(self, expiry, strike, option_type, timestamp):
+        offsets = self.locate(expiry, strike, option_type, timestamp.date())
+
+        if offsets is None:
+            return None
+
+        minute = session_minute(timestamp)
+
+        if minute < 0 or minute >= SESSION_MINUTES:
+            return None
+
+        values = self.cube(expiry)[offsets + (minute,)]
+
+        if np.isnan(values[0]):
+            return None
+
+        return dict(zip(CUBE_FIELDS, values.tolist()))
+
+    def contract_day(self, expiry, strike, option_type, trading_day):
+        offsets = self.locate(expiry, strike, option_type, trading_day)
+
+        if offsets is None:
+            return None
+
+        values = np.asarray(self.cube(expiry)[offsets])
+        present = ~np.isnan(values[:, 0])
+
+        df = pd.DataFrame(values[present], columns=CUBE_FIELDS)
+        df.insert(0, "timestamp", session_timestamps(trading_day)[present])
+        df["volume"] = df["volume"].astype(np.int64)
+
+        minutes = np.flatnonzero(present)
+        df["epoch_minute"] = (
+            epoch_day(trading_day) * MINUTES_PER_DAY + SESSION_START_MINUTE + minutes
+        )
+        df["minute_of_session"] = minutes.astype(np.uint16)
+
+        return df
+
+    # Every contract with at least one bar on the day, keyed by (strike, type).
+    def chain_day(self, expiry, trading_day):
+        self.load_index()
+
+        if expiry not in self.index:
+            return {}
+
+        chain = {}
+        for strike in self.index[expiry]["strikes"]:
+            for option_type in OPTION_TYPES:
+                df = self.contract_day(expiry, strike, option_type, trading_day)
+
+                if df is not None and len(df):
+                    chain[(int(strike), option_type)] = df
+
+        return chain
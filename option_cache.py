@@ -0,0 +1,55 @@
+from collections import OrderedDict
+
+
+OPTION_CACHE_SIZE = 128
+
+
+# === PER-DAY CONTRACT CACHE === #
+# Holds the indicator-enriched bars of one contract for one trading day, keyed by
+# (expiry, strike, option type, trading day). The loader is called once per
+# contract-day and must return a DataFrame with an "epoch_minute" column, or
+# None when the contract does not exist. get_day() returns the day's bars keyed
+# by epoch minute (see engine.market_data.OptionData.bar).
+class OptionDayCache:
+    def __init__(self, loader, maxsize=OPTION_CACHE_SIZE):
+        self.loader = loader
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_day(self, expiry_folder, strike, option_type, trading_day):
+        key = (expiry_folder, strike, option_type, trading_day)
+
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+        self.misses += 1
+
+        df = self.loader(expiry_folder, strike, option_type, trading_day)
+
+        bars = None
+        if df is not None:
+            bars = dict(zip(df["epoch_minute"].tolist(), df.to_dict(orient="records")))
+
+        self.entries[key] = bars
+
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+        return bars
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self.entries),
+        }
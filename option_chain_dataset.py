@@ -0,0 +1,154 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from market_time import add_time_codes
+
+
+OPTIONS_DATASET = "database/options_chain/"
+CHAIN_ROW_GROUP_SIZE = 4096
+CHAIN_SORT_KEYS = ["strike", "option_type", "timestamp"]
+
+PARTITIONING = ds.partitioning(
+    pa.schema([("expiry", pa.string()), ("trade_date", pa.string())]),
+    flavor="hive",
+)
+
+
+# === PARTITION PATHS === #
+def partition_path(dataset_root, expiry, trading_day):
+    return os.path.join(dataset_root, f"expiry={expiry}", f"trade_date={trading_day}")
+
+
+def list_expiries(dataset_root=OPTIONS_DATASET):
+    return [
+        folder.split("=", 1)[1]
+        for folder in os.listdir(dataset_root)
+        if folder.startswith("expiry=")
+    ]
+
+
+# === WRITE CHAIN === #
+# `df` holds one row per bar with "expiry", "trade_date", "strike", "option_type"
+# and "timestamp" columns. Every (expiry, trade_date) partition present in `df`
+# is replaced as a whole, so re-ingesting a day never duplicates bars.
+def write_chain(df, dataset_root=OPTIONS_DATASET):
+    if df.empty:
+        return
+
+    df = df.astype({"expiry": str, "trade_date": str, "option_type": str})
+    df["strike"] = df["strike"].astype("int32")
+    df = df.sort_values(["expiry", "trade_date"] + CHAIN_SORT_KEYS)
+
+    ds.write_dataset(
+        pa.Table.from_pandas(df, preserve_index=False),
+        dataset_root,
+        format="parquet",
+        partitioning=PARTITIONING,
+        existing_data_behavior="delete_matching",
+        basename_template="part-{i}.parquet",
+        max_rows_per_group=CHAIN_ROW_GROUP_SIZE,
+        min_rows_per_group=CHAIN_ROW_GROUP_SIZE,
+    )
+
+
+# === READ CHAIN === #
+# Reads a single (expiry, trade_date) partition. Strike/type filters are pushed
+# down to the row group statistics, which are tight because rows are sorted.
+def load_chain_day(
+    expiry,
+    trading_day,
+    columns=None,
+    strikes=None,
+    option_type=None,
+    dataset_root=OPTIONS_DATASET,
+):
+    path = partition_path(dataset_root, expiry, trading_day)
+
+    if not os.path.isdir(path):
+        return None
+
+    filters = []
+    if strikes is not None:
+        filters.append(("strike", "in", [int(strike) for strike in strikes]))
+    if option_type is not None:
+        filters.append(("option_type", "=", option_type))
+
+    table = pq.read_table(
+        path,
+        columns=columns,
+        filters=filters or None,
+        partitioning=None,
+    )
+
+    return table.to_pandas()
+
+
+def open_chain_dataset(dataset_root=OPTIONS_DATASET):
+    return ds.dataset(dataset_root, format="parquet", partitioning=PARTITIONING)
+
+
+class ChainDayReader:
+    def __init__(self, dataset_root=OPTIONS_DATASET):
+        self.dataset_root = dataset_root
+        self.key = None
+        self.contracts = {}
+
+    def chain_day(self, expiry, trading_day):
+        key = (expiry, str(trading_day))
+
+        if key != self.key:
+            chain = load_chain_day(expiry, trading_day, dataset_root=self.dataset_root)
+
+            self.key = key
+            self.contracts = {}
+
+            if chain is not None:
+                for contract, df in chain.groupby(
+                    ["strike", "option_type"], sort=False
+                ):
+                    self.contracts[contract] = df.drop(
+                        columns=["strike", "option_type"]
+                    ).reset_index(drop=True)
+
+        return self.contracts
+
+    def contract_day(self, expiry, strike, option_type, trading_day):
+        return self.chain_day(expiry, trading_day).get((int(strike), option_type))
+
+
+# === CONVERT ONE-FILE-PER-CONTRACT LAYOUT === #
+def convert_options_folder(options_folder, dataset_root=OPTIONS_DATASET):
+    for expiry_folder in sorted(os.listdir(options_folder)):
+        frames = []
+
+        for strike_folder in os.listdir(os.path.join(options_folder, expiry_folder)):
+            for option_type in ["CE", "PE"]:
+                file_path = os.path.join(
+                    options_folder,
+                    expiry_folder,
+                    strike_folder,
+                    f"NIFTY{expiry_folder}{strike_folder}{option_type}.parquet",
+                )
+
+                if not os.path.exists(file_path):
+                    continue
+
+                df = pd.read_parquet(file_path, engine="pyarrow")
+                df = df.drop(columns=["symbol"], errors="ignore")
+                df["timestamp"] = pd.to_datetime(df["timestamp"])
+                df["strike"] = int(strike_folder)
+                df["option_type"] = option_type
+                frames.append(df)
+
+        if not frames:
+            continue
+
+        df = pd.concat(frames, ignore_index=True)
+        df["expiry"] = expiry_folder
+        df["trade_date"] = df["timestamp"].dt.date.astype(str)
+
+        write_chain(add_time_codes(df), dataset_root)
@@ -0,0 +1,45 @@
+import argparse
+
+import pandas as pd
+import pyarrow as pa
+
+
+# === RENDER EVENT LOG === #
+# Prints an Arrow event log written in LOG_MODE = "events" (see
+# engine/event_log.py) as text, for one trading day or a market time range:
+#
+#   python render_events.py logs/backtest_directional_events.arrow --day 2024-05-30
+#   python render_events.py logs/backtest_directional_events.arrow \
+#       --start "2024-05-30 09:30" --end "2024-05-30 10:00" --logger root
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render a backtest event log")
+    parser.add_argument("event_log")
+    parser.add_argument("--day", default=None, help="trading day, YYYY-MM-DD")
+    parser.add_argument("--start", default=None, help="first market time")
+    parser.add_argument("--end", default=None, help="last market time")
+    parser.add_argument(
+        "--logger", default=None, help='"root" for trades only, "bars" for bar traces'
+    )
+    parser.add_argument("--level", default=None, help="e.g. WARNING")
+    args = parser.parse_args()
+
+    with pa.memory_map(args.event_log) as source:
+        events = pa.ipc.open_file(source).read_all().to_pandas()
+
+    start, end = args.start, args.end
+
+    if args.day is not None:
+        start = pd.Timestamp(args.day)
+        end = start + pd.Timedelta(days=1) - pd.Timedelta(1, unit="ns")
+
+    if start is not None:
+        events = events[events["market_time"] >= pd.Timestamp(start)]
+    if end is not None:
+        events = events[events["market_time"] <= pd.Timestamp(end)]
+    if args.logger is not None:
+        events = events[events["logger"] == args.logger]
+    if args.level is not None:
+        events = events[events["level"] == args.level.upper()]
+
+    for event in events.itertuples(index=False):
+        print(f"{event.market_time} - {event.logger} - {event.level} - {event.message}")
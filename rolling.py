@@ -0,0 +1,113 @@
+import numpy as np
+
+
+# === ROLLING WINDOWS === #
+# Rolling sum/mean/var over [contract, bar] arrays from cumulative sums, with
+# pandas' rolling semantics: NaN is skipped, a window with fewer than
+# min_periods observations is NaN, and a window whose observations are all
+# equal gives that value exactly (zero variance). window=None is expanding.
+def window_difference(cumulative, window):
+    if window is None:
+        return cumulative
+
+    difference = cumulative.copy()
+    difference[:, window:] -= cumulative[:, :-window]
+
+    return difference
+
+
+def forward_fill(values, observed):
+    positions = np.where(observed, np.arange(values.shape[1]), 0)
+    np.maximum.accumulate(positions, axis=1, out=positions)
+
+    return np.take_along_axis(values, positions, axis=1)
+
+
+class RollingWindow:
+    def __init__(self, values, window, min_periods=None):
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+
+        observed = ~np.isnan(values)
+        observed_count = np.cumsum(observed, axis=1)
+        self.nobs = window_difference(observed_count, window)
+
+        # Length of the run of equal observations ending at each bar; the
+        # window is constant when that run covers all of its observations.
+        self.last = forward_fill(values, observed)
+        previous = np.full(values.shape, np.nan)
+        previous[:, 1:] = self.last[:, :-1]
+        previous[:, 1:][~np.cumsum(observed, axis=1)[:, :-1].astype(bool)] = np.nan
+
+        run_start = np.where(
+            observed & (values != previous), np.arange(values.shape[1]), 0
+        )
+        np.maximum.accumulate(run_start, axis=1, out=run_start)
+        before_run = np.take_along_axis(observed_count, run_start, axis=1) - 1
+        self.constant = (observed_count - before_run >= self.nobs) & (
+            observed_count > 0
+        )
+
+        # Sums are taken around each contract's first observation to keep the
+        # cumulative sums small.
+        first = np.argmax(observed, axis=1)
+        self.reference = np.where(
+            observed.any(axis=1), values[np.arange(len(values)), first], 0.0
+        )[:, None]
+        self.centered = np.where(observed, values - self.reference, 0.0)
+        self.centered_sum = window_difference(np.cumsum(self.centered, axis=1), window)
+        self.negative = window_difference(
+            np.cumsum(observed & (values < 0), axis=1), window
+        )
+
+    def valid(self, min_count=0):
+        return (self.nobs >= self.min_periods) & (self.nobs > min_count)
+
+    def sum(self):
+        total = np.where(
+            self.constant,
+            self.last * self.nobs,
+            self.centered_sum + self.reference * self.nobs,
+        )
+
+        return np.where(self.nobs >= self.min_periods, total, np.nan)
+
+    def mean(self):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = self.centered_sum / self.nobs + self.reference
+
+        mean = np.where((self.negative == 0) & (mean < 0), 0.0, mean)
+        mean = np.where((self.negative == self.nobs) & (mean > 0), 0.0, mean)
+        mean = np.where(self.constant, self.last, mean)
+
+        return np.where(self.valid(), mean, np.nan)
+
+    def var(self, ddof=1):
+        squares = window_difference(np.cumsum(self.centered**2, axis=1), self.window)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            var = (squares - self.centered_sum**2 / self.nobs) / (self.nobs - ddof)
+
+        var = np.where(var < 0, 0.0, var)
+        var = np.where(self.constant | (self.nobs == 1), 0.0, var)
+
+        return np.where(self.valid(max(ddof, 0)) & (self.nobs >= 1), var, np.nan)
+
+    def std(self, ddof=1):
+        return np.sqrt(self.var(ddof))
+
+
+def rolling_sum(values, window, min_periods=None):
+    return RollingWindow(values, window, min_periods).sum()
+
+
+def rolling_mean(values, window, min_periods=None):
+    return RollingWindow(values, window, min_periods).mean()
+
+
+def rolling_var(values, window, min_periods=None, ddof=1):
+    return RollingWindow(values, window, min_periods).var(ddof)
+
+
+def rolling_std(values, window, min_periods=None, ddof=1):
+    return RollingWindow(values, window, min_periods).std(ddof)
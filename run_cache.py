@@ -0,0 +1,156 @@
+import argparse
+import importlib
+import json
+import logging
+import os
+import time
+
+import pandas as pd
+
+from engine.run_cache import RUN_CACHE, RUN_CACHE_MAX_BYTES, RunCache, cached_backtest
+
+
+STRATEGIES = ["directional", "mean_reversion", "semi_directional"]
+
+
+def matching_entries(cache, keys):
+    entries = []
+
+    for prefix in keys:
+        found = cache.find(prefix)
+
+        if not found:
+            print(f"No cache entry: {prefix}")
+
+        entries += found
+
+    return entries
+
+
+# === RUN CACHE === #
+# Backtest runs through the run cache (see engine/run_cache.py) and cache
+# maintenance:
+#
+#   python run_cache.py run directional --start 2024-01-01 --end 2024-06-30
+#   python run_cache.py list
+#   python run_cache.py inspect 3f2a9c
+#   python run_cache.py purge 3f2a9c | --strategy directional | --older-than 30 | --all
+#
+# `run` prints the stats of a run from its backtest_<strategy>.py settings,
+# simulating only the days the cache does not have; keys can be abbreviated.
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest run cache")
+    parser.add_argument("--folder", default=RUN_CACHE)
+    parser.add_argument(
+        "--max-size",
+        type=float,
+        default=RUN_CACHE_MAX_BYTES / 1024**2,
+        help="MB kept after a run; least recently used entries are evicted",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="backtest through the cache")
+    run_parser.add_argument("strategy", choices=STRATEGIES)
+    run_parser.add_argument("--start", default="2024-01-01")
+    run_parser.add_argument("--end", default="2024-12-31")
+    run_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="worker processes for the days not cached (0: one per CPU)",
+    )
+    run_parser.add_argument(
+        "--output", default=None, help="CSV file for the run's positions"
+    )
+
+    list_parser = commands.add_parser("list", help="list cache entries")
+    list_parser.add_argument("--kind", choices=["day", "run"], default=None)
+
+    inspect_parser = commands.add_parser("inspect", help="show entry metadata")
+    inspect_parser.add_argument("keys", nargs="+")
+
+    purge_parser = commands.add_parser("purge", help="delete cache entries")
+    purge_parser.add_argument("keys", nargs="*")
+    purge_parser.add_argument("--strategy", choices=STRATEGIES, default=None)
+    purge_parser.add_argument(
+        "--older-than", type=float, default=None, help="days since last use"
+    )
+    purge_parser.add_argument("--all", action="store_true")
+    args = parser.parse_args()
+
+    cache = RunCache(args.folder, int(args.max_size * 1024**2))
+
+    if args.command == "run":
+        script = importlib.import_module(f"backtest_{args.strategy}")
+
+        # Per-day progress goes to the strategy's log file only.
+        logging.getLogger().setLevel(logging.WARNING)
+
+        start = time.time()
+        positions, stats = cached_backtest(
+            script.strategy(),
+            script.backtest_config(),
+            args.start,
+            args.end,
+            cache,
+            workers=args.workers or None,
+        )
+
+        for name, value in stats.items():
+            print(f"{name}: {value}")
+
+        if args.output:
+            os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+            positions.to_csv(args.output, index=False)
+
+        print(
+            f"{len(positions)} positions, cache {cache.stats()}, "
+            f"{time.time() - start:.1f}s"
+        )
+
+    elif args.command == "list":
+        entries = cache.entries()
+
+        if args.kind is not None:
+            entries = entries[entries["Kind"] == args.kind]
+
+        if not entries.empty:
+            print(entries.to_string(index=False))
+
+        print(
+            f"{len(entries)} entries, {cache.size() / 1024**2:.1f} of "
+            f"{cache.max_bytes / 1024**2:.0f} MB"
+        )
+
+    elif args.command == "inspect":
+        for kind, key in matching_entries(cache, args.keys):
+            print(
+                json.dumps(
+                    {"kind": kind, "key": key, **cache.metadata(kind, key)}, indent=2
+                )
+            )
+
+    elif args.command == "purge":
+        entries = cache.entries()
+        selected = set(matching_entries(cache, args.keys))
+
+        if args.strategy is not None:
+            selected |= {
+                (row["Kind"], row["Key"])
+                for _, row in entries[entries["Strategy"] == args.strategy].iterrows()
+            }
+
+        if args.older_than is not None:
+            cutoff = pd.Timestamp.now() - pd.Timedelta(days=args.older_than)
+            selected |= {
+                (row["Kind"], row["Key"])
+                for _, row in entries[entries["Last Used"] < cutoff].iterrows()
+            }
+
+        if args.all:
+            selected = set(cache.entry_files())
+
+        for kind, key in selected:
+            cache.remove(kind, key)
+
+        print(f"Purged {len(selected)} entries")
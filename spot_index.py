@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+from market_time import MINUTES_PER_DAY, day_minute, epoch_day, read_bars
+
+
+# === SPOT INDEX SPLIT BY TRADING DAY === #
+# The year is sorted once by epoch minute and cut into contiguous day slices,
+# so a day is a pair of offsets instead of a boolean scan over the full year.
+class SpotIndex:
+    def __init__(self, df):
+        epoch_minutes = df["epoch_minute"].to_numpy()
+        order = np.argsort(epoch_minutes, kind="stable")
+
+        self.epoch_minutes = epoch_minutes[order]
+        self.timestamps = pd.DatetimeIndex(df["timestamp"].to_numpy()[order])
+        self.closes = df["close"].to_numpy(dtype=np.float64)[order]
+
+        self.day_codes, self.day_starts = np.unique(
+            self.epoch_minutes // MINUTES_PER_DAY, return_index=True
+        )
+        self.day_stops = np.append(self.day_starts[1:], len(self.epoch_minutes))
+        self.day_positions = {
+            int(code): i for i, code in enumerate(self.day_codes.tolist())
+        }
+
+    @classmethod
+    def load(cls, path):
+        df = read_bars(path, ["timestamp", "close"])
+        df["timestamp"] = pd.to_datetime(df["timestamp"])
+
+        return cls(df)
+
+    def __len__(self):
+        return len(self.epoch_minutes)
+
+    def trading_days(self):
+        return pd.to_datetime(self.day_codes, unit="D").date
+
+    def day(self, trading_day, start_time=None, end_time=None):
+        code = epoch_day(trading_day)
+        position = self.day_positions.get(code)
+
+        if position is None:
+            return SpotDay(self, 0, 0, code, start_time, end_time)
+
+        return SpotDay(
+            self,
+            self.day_starts[position],
+            self.day_stops[position],
+            code,
+            start_time,
+            end_time,
+        )
+
+
+class SpotDay:
+    def __init__(self, index, start, stop, code, start_time=None, end_time=None):
+        self.timestamps = index.timestamps[start:stop]
+        self.closes = index.closes[start:stop]
+        self.epoch_minutes = index.epoch_minutes[start:stop]
+
+        day_start = code * MINUTES_PER_DAY
+
+        # First bar at/after start_time and first bar after end_time.
+        self.session_start = 0
+        if start_time is not None:
+            self.session_start = int(
+                np.searchsorted(
+                    self.epoch_minutes, day_start + day_minute(start_time), "left"
+                )
+            )
+
+        self.session_end = len(self.epoch_minutes)
+        if end_time is not None:
+            self.session_end = int(
+                np.searchsorted(
+                    self.epoch_minutes, day_start + day_minute(end_time), "right"
+                )
+            )
+
+    def __len__(self):
+        return len(self.epoch_minutes)
+
+    # Bars between session_start and session_end, as plain Python values.
+    def bars(self):
+        start, stop = self.session_start, self.session_end
+
+        return zip(
+            self.timestamps[start:stop],
+            self.closes[start:stop].tolist(),
+            self.epoch_minutes[start:stop].tolist(),
+        )
@@ -0,0 +1,351 @@
+import math
+from collections import deque
+
+
+NAN = float("nan")
+
+
+# Float division with NumPy semantics (x/0 -> +-inf, 0/0 -> nan), so the
+# streaming values match the batched arrays instead of raising.
+def divide(numerator, denominator):
+    if denominator == 0:
+        if numerator == 0 or numerator != numerator:
+            return NAN
+
+        return math.copysign(math.inf, numerator) * math.copysign(1, denominator)
+
+    return numerator / denominator
+
+
+# === STATE === #
+# Indicators keep only plain floats/ints, deques and nested indicators, so
+# state() is JSON serialisable and load_state() restores a mid-day indicator.
+class StreamingIndicator:
+    def state(self):
+        state = {}
+
+        for name, value in vars(self).items():
+            if isinstance(value, StreamingIndicator):
+                value = value.state()
+            elif isinstance(value, deque):
+                value = list(value)
+
+            state[name] = value
+
+        return state
+
+    def load_state(self, state):
+        for name, value in state.items():
+            current = getattr(self, name)
+
+            if isinstance(current, StreamingIndicator):
+                current.load_state(value)
+            elif isinstance(current, deque):
+                setattr(self, name, deque(value, maxlen=current.maxlen))
+            else:
+                setattr(self, name, value)
+
+        return self
+
+
+# === ROLLING WINDOWS === #
+# Same Kahan-compensated add/remove updates as pandas' rolling kernels, one
+# value at a time, so values equal the pandas formulas exactly (the batched
+# cumulative-sum kernels in rolling.py agree to rounding). window=None is the
+# expanding version.
+class RollingSum(StreamingIndicator):
+    def __init__(self, window, min_periods=None):
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+        self.values = deque(maxlen=window)
+        self.nobs = 0
+        self.sum_x = 0.0
+        self.compensation_add = 0.0
+        self.compensation_remove = 0.0
+        self.same = 0
+        self.prev = NAN
+
+    def remove(self, val):
+        if val == val:
+            self.nobs -= 1
+            y = -val - self.compensation_remove
+            t = self.sum_x + y
+            self.compensation_remove = t - self.sum_x - y
+            self.sum_x = t
+
+    def add(self, val):
+        if val == val:
+            self.nobs += 1
+            y = val - self.compensation_add
+            t = self.sum_x + y
+            self.compensation_add = t - self.sum_x - y
+            self.sum_x = t
+
+            self.same = self.same + 1 if val == self.prev else 1
+            self.prev = val
+
+    def push(self, val):
+        if self.window is not None and len(self.values) == self.window:
+            self.remove(self.values.popleft())
+
+        if self.window is not None:
+            self.values.append(val)
+
+        self.add(val)
+
+    def update(self, val):
+        self.push(val)
+
+        if self.nobs < self.min_periods:
+            return NAN
+
+        if self.same >= self.nobs:
+            return self.prev * self.nobs
+
+        return self.sum_x
+
+
+class RollingMean(RollingSum):
+    def __init__(self, window, min_periods=None):
+        super().__init__(window, min_periods)
+        self.neg_ct = 0
+
+    def remove(self, val):
+        super().remove(val)
+
+        if val < 0:
+            self.neg_ct -= 1
+
+    def add(self, val):
+        super().add(val)
+
+        if val < 0:
+            self.neg_ct += 1
+
+    def update(self, val):
+        self.push(val)
+
+        if self.nobs < self.min_periods or self.nobs == 0:
+            return NAN
+
+        if self.same >= self.nobs:
+            return self.prev
+
+        result = self.sum_x / self.nobs
+
+        if self.neg_ct == 0 and result < 0:
+            return 0.0
+        if self.neg_ct == self.nobs and result > 0:
+            return 0.0
+
+        return result
+
+
+class RollingVar(StreamingIndicator):
+    def __init__(self, window, min_periods=None, ddof=1):
+        self.window = window
+        self.min_periods = max(window if min_periods is None else min_periods, 1)
+        self.ddof = ddof
+        self.values = deque(maxlen=window)
+        self.nobs = 0
+        self.mean_x = 0.0
+        self.ssqdm_x = 0.0
+        self.compensation_add = 0.0
+        self.compensation_remove = 0.0
+        self.same = 0
+        self.prev = NAN
+
+    def remove(self, val):
+        if val != val:
+            return
+
+        self.nobs -= 1
+
+        if self.nobs:
+            prev_mean = self.mean_x - self.compensation_remove
+            y = val - self.compensation_remove
+            t = y - self.mean_x
+            self.compensation_remove = t + self.mean_x - y
+            self.mean_x -= t / self.nobs
+            self.ssqdm_x -= (val - prev_mean) * (val - self.mean_x)
+        else:
+            self.mean_x = 0.0
+            self.ssqdm_x = 0.0
+
+    def add(self, val):
+        if val != val:
+            return
+
+        self.same = self.same + 1 if val == self.prev else 1
+        self.prev = val
+
+        self.nobs += 1
+        prev_mean = self.mean_x - self.compensation_add
+        y = val - self.compensation_add
+        t = y - self.mean_x
+        self.compensation_add = t + self.mean_x - y
+        self.mean_x += t / self.nobs
+        self.ssqdm_x += (val - prev_mean) * (val - self.mean_x)
+
+    def update(self, val):
+        if self.window is not None and len(self.values) == self.window:
+            self.remove(self.values.popleft())
+
+        if self.window is not None:
+            self.values.append(val)
+
+        self.add(val)
+
+        if self.nobs < self.min_periods or self.nobs <= self.ddof:
+            return NAN
+
+        if self.nobs == 1 or self.same >= self.nobs:
+            return 0.0
+
+        return self.ssqdm_x / (self.nobs - self.ddof)
+
+
+# === INDICATORS === #
+# update(bar) takes a bar dict ("high", "low", "close", "volume") and returns
+# the same columns calculate_indicators() adds for that bar.
+class EMA(StreamingIndicator):
+    def __init__(self, span):
+        self.alpha = 1.0 / (1.0 + (span - 1) / 2.0)
+        self.weighted = None
+        self.old_wt = 1.0
+
+    def update(self, bar):
+        cur = bar["close"]
+
+        if self.weighted is None:
+            self.weighted = cur
+        elif self.weighted == self.weighted:
+            self.old_wt *= 1.0 - self.alpha
+
+            if cur == cur:
+                if self.weighted != cur:
+                    self.weighted = (self.old_wt * self.weighted + self.alpha * cur) / (
+                        self.old_wt + self.alpha
+                    )
+                self.old_wt = 1.0
+        elif cur == cur:
+            self.weighted = cur
+
+        return {"EMA": self.weighted}
+
+
+# The strategy's own ADX: directional movement summed over the window and
+# scaled by the summed close.
+class ADX(StreamingIndicator):
+    def __init__(self, period):
+        self.plus_dm = RollingSum(period)
+        self.minus_dm = RollingSum(period)
+        self.close = RollingSum(period)
+        self.dx = RollingMean(period)
+        self.prev_high = NAN
+        self.prev_low = NAN
+
+    def update(self, bar):
+        up_move = bar["high"] - self.prev_high
+        down_move = self.prev_low - bar["low"]
+        self.prev_high = bar["high"]
+        self.prev_low = bar["low"]
+
+        close_sum = self.close.update(bar["close"])
+        plus_di = (
+            divide(
+                self.plus_dm.update(up_move if up_move > down_move else 0.0), close_sum
+            )
+            * 100
+        )
+        minus_di = (
+            divide(
+                self.minus_dm.update(down_move if down_move > up_move else 0.0),
+                close_sum,
+            )
+            * 100
+        )
+        dx = divide(abs(plus_di - minus_di), abs(plus_di + minus_di)) * 100
+
+        return {"+DI": plus_di, "-DI": minus_di, "ADX": self.dx.update(dx)}
+
+
+class VWAP(StreamingIndicator):
+    def __init__(self):
+        self.price_volume = 0.0
+        self.volume = 0.0
+
+    def update(self, bar):
+        typical_price = (bar["high"] + bar["low"] + bar["close"]) / 3
+
+        self.price_volume += typical_price * bar["volume"]
+        self.volume += bar["volume"]
+
+        return {"VWAP": divide(self.price_volume, self.volume)}
+
+
+class BollingerBands(StreamingIndicator):
+    def __init__(self, period):
+        self.mean = RollingMean(period)
+        self.var = RollingVar(period)
+
+    def update(self, bar):
+        sma = self.mean.update(bar["close"])
+        variance = self.var.update(bar["close"])
+        std = math.sqrt(0.0 if variance < 0 else variance)
+
+        return {
+            "SMA": sma,
+            "StdDev": std,
+            "UpperBB": sma + (2 * std),
+            "LowerBB": sma - (2 * std),
+        }
+
+
+class RSI(StreamingIndicator):
+    def __init__(self, period):
+        self.gain = RollingMean(period)
+        self.loss = RollingMean(period)
+        self.prev_close = NAN
+
+    def update(self, bar):
+        delta = bar["close"] - self.prev_close
+        self.prev_close = bar["close"]
+
+        gain = self.gain.update(delta if delta > 0 else 0.0)
+        loss = self.loss.update(-(delta if delta < 0 else 0.0))
+
+        return {"RSI": 100 - divide(100, 1 + divide(gain, loss))}
+
+
+class ATR(StreamingIndicator):
+    def __init__(self, period):
+        self.true_range = RollingMean(None, min_periods=period)
+        self.prev_close = NAN
+
+    def update(self, bar):
+        ranges = [
+            bar["high"] - bar["low"],
+            abs(bar["high"] - self.prev_close),
+            abs(bar["low"] - self.prev_close),
+        ]
+        self.prev_close = bar["close"]
+
+        ranges = [value for value in ranges if value == value]
+
+        return {"ATR": self.true_range.update(max(ranges) if ranges else NAN)}
+
+
+# A contract's indicators updated together; update() returns the merged columns.
+class IndicatorSet(StreamingIndicator):
+    def __init__(self, **indicators):
+        for name, indicator in indicators.items():
+            setattr(self, name, indicator)
+
+    def update(self, bar):
+        values = {}
+
+        for indicator in vars(self).values():
+            values.update(indicator.update(bar))
+
+        return values
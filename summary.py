@@ -6,6 +6,72 @@ import traceback
 sys.path.append(os.getcwd())
 
 
+# === COMBINE LEGS === #
+# A day's positions file has one row per leg and the strategies always open two
+# legs together; consecutive rows are paired into one trade row, as in the
+# summary notebook. An unpaired last row is dropped.
+def combine_leg_positions(positions):
+    pairs = len(positions) // 2
+    first = positions.iloc[0 : 2 * pairs : 2].reset_index(drop=True)
+    second = positions.iloc[1 : 2 * pairs : 2].reset_index(drop=True)
+
+    combined = pd.DataFrame(
+        {
+            "Instruments": first["Strike"].astype(str)
+            + first["Option Type"].astype(str)
+            + ", "
+            + second["Strike"].astype(str)
+            + second["Option Type"].astype(str),
+            "Entry Timestamp": first["Entry Timestamp"].where(
+                first["Entry Timestamp"] <= second["Entry Timestamp"],
+                second["Entry Timestamp"],
+            ),
+            "Entry Price": first["Entry Price"] + second["Entry Price"],
+            "Exit Timestamp": first["Exit Timestamp"].where(
+                first["Exit Timestamp"] >= second["Exit Timestamp"],
+                second["Exit Timestamp"],
+            ),
+            "Exit Price": first["Exit Price"] + second["Exit Price"],
+            "Quantity": first["Quantity"] + second["Quantity"],
+            "Lot Size": first["Lot Size"],
+            "PnL per Lot": first["PnL per Lot"] + second["PnL per Lot"],
+            "Cost per Lot": first["Cost per Lot"] + second["Cost per Lot"],
+            "Net PnL per Lot": first["Net PnL per Lot"] + second["Net PnL per Lot"],
+            "Exit Reason": first["Exit Reason"],
+        }
+    )
+    combined["Month"] = pd.to_datetime(combined["Exit Timestamp"]).dt.month
+    combined["Hold Time"] = first["Hold Time"].where(
+        first["Hold Time"] >= second["Hold Time"], second["Hold Time"]
+    )
+
+    return combined
+
+
+# Nearest expiry, days to expiry and the expiry day flag after "Exit Reason".
+def add_expiry_columns(positions, expiry_calendar):
+    exit_timestamps = pd.to_datetime(positions["Exit Timestamp"])
+    exit_reason_loc = positions.columns.get_loc("Exit Reason")
+
+    positions.insert(
+        exit_reason_loc + 1,
+        "Nearest Expiry Date",
+        expiry_calendar.nearest_many(exit_timestamps.dt.normalize()),
+    )
+    positions.insert(
+        exit_reason_loc + 2,
+        "Days to Expiry",
+        expiry_calendar.days_to_expiry_many(exit_timestamps),
+    )
+    positions.insert(
+        exit_reason_loc + 3,
+        "Expiry Day Flag",
+        positions["Days to Expiry"] == 0,
+    )
+
+    return positions
+
+
 def calculate_stats_from_trades(trades):
     try:
         stats = {}
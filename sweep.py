@@ -0,0 +1,77 @@
+import argparse
+import importlib
+import json
+import logging
+import os
+import time
+
+from engine.sweep import SWEEP_CHUNK_SIZE, run_sweep
+
+
+STRATEGIES = ["directional", "mean_reversion", "semi_directional"]
+
+
+# === PARAMETER SWEEP === #
+# Runs every combination of a parameter grid for one strategy. Defaults come
+# from the strategy's backtest script (backtest_<strategy>.py); the grid is a
+# JSON object of parameter name -> list of values, e.g.
+#
+#   {"profit_target": [0.1, 0.15, 0.2], "adx_period": [14, 21],
+#    "adx_entry": [20, 25, 30], "slippage_percent": [0.005, 0.01]}
+#
+# Names are strategy parameters (periods, thresholds, profit_target, stop_loss,
+# hold_time) or BacktestConfig fields.
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Strategy parameter sweep")
+    parser.add_argument("strategy", choices=STRATEGIES)
+    parser.add_argument("grid", help="JSON file with the parameter grid")
+    parser.add_argument("--start", default="2024-01-01")
+    parser.add_argument("--end", default="2024-12-31")
+    parser.add_argument(
+        "--output", default=None, help="default: sweeps/<strategy>_sweep.csv"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="worker processes (default: one per CPU, 1 runs in-process)",
+    )
+    parser.add_argument("--chunk-size", type=int, default=SWEEP_CHUNK_SIZE)
+    parser.add_argument(
+        "--mode",
+        default="vectorized",
+        choices=["loop", "vectorized"],
+        help="backtest mode for every combination",
+    )
+    args = parser.parse_args()
+
+    script = importlib.import_module(f"backtest_{args.strategy}")
+
+    # Per-day progress of thousands of runs is not worth logging.
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with open(args.grid) as f:
+        grid = json.load(f)
+
+    config = script.backtest_config()
+    config.mode = args.mode
+
+    start = time.time()
+    results = run_sweep(
+        script.strategy(),
+        config,
+        grid,
+        args.start,
+        args.end,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+    )
+
+    output = args.output or f"sweeps/{args.strategy}_sweep.csv"
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    results.to_csv(output, index=False)
+
+    print(
+        f"Saved {output}: {len(results)} combinations, "
+        f"{results['Error'].notna().sum()} failed, {time.time() - start:.1f}s"
+    )
@@ -0,0 +1,90 @@
+import argparse
+import importlib
+import json
+import logging
+import os
+import time
+
+from engine.sweep import SWEEP_CHUNK_SIZE
+from engine.walk_forward import run_walk_forward
+from summary import calculate_stats_from_trades
+
+
+STRATEGIES = ["directional", "mean_reversion", "semi_directional"]
+
+
+# === WALK FORWARD === #
+# Walk-forward optimisation of one strategy over a parameter grid (same JSON
+# format as sweep.py): every --train-days trading days the grid is optimised
+# by --metric (any calculate_stats_from_trades key, e.g. "Calmar Ratio",
+# "Net PnL") and the winner is traded on the next --test-days days. Writes the
+# out-of-sample trades for app.py and a per-window summary:
+#
+#   walk_forward/<strategy>_walk_forward.csv
+#   walk_forward/<strategy>_walk_forward_windows.csv
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Walk-forward optimisation")
+    parser.add_argument("strategy", choices=STRATEGIES)
+    parser.add_argument("grid", help="JSON file with the parameter grid")
+    parser.add_argument("--start", default="2024-01-01")
+    parser.add_argument("--end", default="2024-12-31")
+    parser.add_argument("--train-days", type=int, default=60)
+    parser.add_argument("--test-days", type=int, default=20)
+    parser.add_argument(
+        "--anchored",
+        action="store_true",
+        help="train on every day from --start instead of a rolling window",
+    )
+    parser.add_argument("--metric", default="Net PnL")
+    parser.add_argument("--output-folder", default="walk_forward")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="worker processes (default: one per CPU, 1 runs in-process)",
+    )
+    parser.add_argument("--chunk-size", type=int, default=SWEEP_CHUNK_SIZE)
+    parser.add_argument(
+        "--mode",
+        default="vectorized",
+        choices=["loop", "vectorized"],
+        help="backtest mode for every combination",
+    )
+    args = parser.parse_args()
+
+    script = importlib.import_module(f"backtest_{args.strategy}")
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with open(args.grid) as f:
+        grid = json.load(f)
+
+    config = script.backtest_config()
+    config.mode = args.mode
+
+    start = time.time()
+    trades, windows = run_walk_forward(
+        script.strategy(),
+        config,
+        grid,
+        args.start,
+        args.end,
+        args.train_days,
+        args.test_days,
+        metric=args.metric,
+        anchored=args.anchored,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+    )
+
+    os.makedirs(args.output_folder, exist_ok=True)
+    output = os.path.join(args.output_folder, f"{args.strategy}_walk_forward")
+    trades.to_csv(f"{output}.csv", index=False)
+    windows.to_csv(f"{output}_windows.csv", index=False)
+
+    stats = calculate_stats_from_trades(trades.copy()) if len(trades) else None
+
+    print(
+        f"Saved {output}.csv: {len(windows)} windows, {len(trades)} out-of-sample trades, "
+        f"{args.metric}: {stats.get(args.metric) if stats else None}, {time.time() - start:.1f}s"
+    )